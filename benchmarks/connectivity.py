@@ -0,0 +1,90 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Compares nodes expanded (queue pops), wall-clock time and path length per grid connectivity (4, 8 and any-angle)
+# for the planners, on pacman layouts; D* Lite and D* walk one grid step at a time, so they are not run any-angle. e.g.
+#   python benchmarks/connectivity.py --layouts openMaze,openSearch,bigMaze --planners dstarlite,dstar
+
+import argparse
+import math
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+from neighbor_tables import load_layout
+from src import d_star as ds
+from src import d_star_lite as dsl
+from src import lifelong_planning_a_star as lpa
+
+
+def path_length(path):
+    return sum(lpa.l2_dist(a, b) for a, b in zip(path, path[1:]))
+
+
+def run_lpa(resolution, walls, start, goal, connectivity):
+    # LPA* with the whole map known up front; one search from scratch
+    planner = lpa.LPAStar(resolution, start, goal, connectivity=connectivity)
+    for coord in sorted(walls):
+        planner.make_wall_at(coord)
+    began = time.time()
+    path = planner.extract_path()
+    return planner._pop_count, time.time() - began, path_length(path) if path else None
+
+
+def run_dstarlite(resolution, walls, start, goal, connectivity):
+    # D* Lite walking towards the goal, discovering walls in the (up to 8) surrounding cells as it goes
+    return walk(dsl.DStarLite, resolution, walls, start, goal, connectivity)
+
+
+def run_dstar(resolution, walls, start, goal, connectivity):
+    # the same walk with D*
+    return walk(ds.DStar, resolution, walls, start, goal, connectivity)
+
+
+def walk(planner_class, resolution, walls, start, goal, connectivity):
+    began = time.time()
+    planner = planner_class(resolution, start, goal, connectivity=connectivity)
+    width, height = resolution
+    position, route = start, [start]
+    while position != goal and len(route) < width * height:
+        x, y = position
+        planner.make_walls_at([(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (x + dx, y + dy) in walls])
+        next_position = planner.take_step()
+        if next_position == position:
+            break  # no path
+        position = next_position
+        route.append(position)
+    return planner._pop_count, time.time() - began, path_length(route)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid connectivity benchmark")
+    parser.add_argument("--layouts", default="openMaze,openSearch,mediumMaze,bigMaze")
+    parser.add_argument("--planners", default="lpastar,dstarlite,dstar")
+    args = parser.parse_args()
+
+    runners = {"lpastar": run_lpa, "dstarlite": run_dstarlite, "dstar": run_dstar}
+    connectivities = {"lpastar": lpa.CONNECTIVITIES, "dstarlite": lpa.WALKED_CONNECTIVITIES,
+                      "dstar": lpa.WALKED_CONNECTIVITIES}
+
+    print("%-12s %-10s %6s %10s %10s %10s" % ("layout", "planner", "conn", "pops", "seconds", "length"))
+    for name in args.layouts.split(","):
+        resolution, walls, start, goal = load_layout(name)
+        for planner_name in args.planners.split(","):
+            runner = runners[planner_name]
+            for connectivity in connectivities[planner_name]:
+                pops, seconds, length = runner(resolution, walls, start, goal, connectivity)
+                print("%-12s %-10s %6s %10d %10.3f %10s" % (name, planner_name, connectivity, pops, seconds,
+                                                            "-" if length is None else "%.2f" % length))
+
+
+if __name__ == "__main__":
+    main()
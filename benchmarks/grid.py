@@ -0,0 +1,121 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Micro-benchmark of game.Grid, which used to keep its cells in a list of lists and hash them one by one into a
+# doubling int, against the bytearray columns that replaced it. Times hash, copy, == and count on the food and wall
+# grids of the given layouts, then A* with foodHeuristic on a FoodSearchProblem (whose states carry a food Grid,
+# copied for every successor and hashed on every lookup) with either grid; the paths and expansions must come out
+# identical, only the times differ. Like the pacman domain itself, this runs under Python 2:
+#   python benchmarks/grid.py --layouts bigSearch,bigMaze --food-layouts tinySearch,trickySearch --repeat 3
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+PACMAN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pacman_domain")
+sys.path.insert(0, PACMAN_DIR)
+import layout
+import pacman
+import search
+import searchAgents
+
+
+class ListGrid:
+    # the grid as it was, for comparison: a list of lists, hashed cell by cell
+    def __init__(self, width, height, data):
+        self.width, self.height = width, height
+        self.data = data
+
+    def __getitem__(self, i):
+        return self.data[i]
+
+    def __eq__(self, other):
+        if other == None: return False
+        return self.data == other.data
+
+    def __hash__(self):
+        base = 1
+        h = 0
+        for l in self.data:
+            for i in l:
+                if i:
+                    h += base
+                base *= 2
+        return hash(h)
+
+    def copy(self):
+        return ListGrid(self.width, self.height, [x[:] for x in self.data])
+
+    def count(self, item=True):
+        return sum([x.count(item) for x in self.data])
+
+    def asList(self, key=True):
+        return [(x, y) for x in range(self.width) for y in range(self.height) if self.data[x][y] == key]
+
+
+GRIDS = [("list", lambda grid: ListGrid(grid.width, grid.height, [[bool(cell) for cell in column]
+                                                                   for column in grid.data])),
+         ("bytearray", lambda grid: grid.copy())]
+
+
+def best(function, number, repeat):
+    # the best of repeat runs, in microseconds per call
+    times = []
+    for _ in range(repeat):
+        began = time.time()
+        for _ in range(number):
+            function()
+        times.append((time.time() - began) / number)
+    return 1e6 * min(times)
+
+
+def food_search(name, make_grid, repeat):
+    state = pacman.GameState()
+    state.initialize(layout.getLayout(name), 0)
+    best_seconds = None
+    for _ in range(repeat):
+        problem = searchAgents.FoodSearchProblem(state)
+        problem.start = (problem.start[0], make_grid(problem.start[1]))
+        began = time.time()
+        actions = search.aStarSearch(problem, searchAgents.foodHeuristic)
+        seconds = time.time() - began
+        best_seconds = seconds if best_seconds is None else min(best_seconds, seconds)
+    return len(actions), problem._expanded, best_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid micro-benchmark")
+    parser.add_argument("--layouts", default="tinySearch,trickySearch,bigSearch,bigMaze")
+    parser.add_argument("--food-layouts", default="tinySearch,trickySearch")
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing of each operation")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    os.chdir(PACMAN_DIR)  # layouts are looked up relative to it
+
+    print("%-14s %-6s %-7s %10s %12s %8s" % ("layout", "grid", "op", "list us", "bytearray us", "speedup"))
+    for name in args.layouts.split(","):
+        lay = layout.getLayout(name)
+        for grid_name, grid in [("food", lay.food), ("walls", lay.walls)]:
+            grids = [(make_grid(grid), make_grid(grid)) for _, make_grid in GRIDS]
+            for op, function in [("hash", lambda g, h: hash(g)), ("copy", lambda g, h: g.copy()),
+                                 ("==", lambda g, h: g == h), ("count", lambda g, h: g.count())]:
+                old, new = [best(lambda g=g, h=h: function(g, h), args.number, args.repeat) for g, h in grids]
+                print("%-14s %-6s %-7s %10.2f %12.2f %7.1fx" % (name, grid_name, op, old, new, old / max(new, 1e-9)))
+
+    print()
+    print("%-14s %6s %9s %10s %12s %8s" % ("layout", "cost", "expanded", "list s", "bytearray s", "speedup"))
+    for name in args.food_layouts.split(","):
+        (cost, expanded, old), (new_cost, new_expanded, new) = [food_search(name, make_grid, args.repeat)
+                                                                for _, make_grid in GRIDS]
+        assert (cost, expanded) == (new_cost, new_expanded), "the grids disagree on " + name
+        print("%-14s %6d %9d %10.3f %12.3f %7.1fx" % (name, cost, expanded, old, new, old / max(new, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
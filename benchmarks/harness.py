@@ -0,0 +1,233 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Headless benchmark suite for the pacman searches; replaces timing `pacman.py` with `time` and `valgrind`.
+# Every (layout, search) pair runs in a fresh child process, so that its memory is its own, and is repeated --repeat
+# times; the counts and costs must come out identical every time, only the wall times vary. Like the pacman domain
+# itself, this runs under Python 2:
+#   python benchmarks/harness.py --repeat 5 --csv results.csv --json results.json
+#   python benchmarks/harness.py --layouts tinyMaze,bigMaze --generated maze-101x101-0 --searches lpastar,dstarlite
+#
+# Layouts are the names of layouts/*.lay files (all of them by default) or generated maps, named as in
+# pacman_domain/mapGenerator.py (e.g. maze-101x101-0 or field-60x60-25-1). The goal is (1, 1), as for
+# ReplanningSearchProblem; layouts where it cannot be reached are reported as unreachable rather than run.
+#
+# Memory is the peak heap of one search: after the timed runs (which double as a warm-up), the search runs once more
+# while a thread samples how much the C allocator has handed out (glibc's mallinfo; python's object arenas come from
+# it too), and the rise above the level before the run is reported. tracemalloc would count python's allocations
+# exactly, but the pacman domain runs on Python 2, which does not have it. Peak RSS cannot tell the searches apart: the
+# interpreter keeps the memory it freed loading the modules and layout, and all but the largest searches fit in it.
+# The sampling has a blind spot: a peak that rises and falls again within SAMPLE_INTERVAL (half a millisecond) of
+# the previous sample is missed, so the figure is a lower bound. Without glibc (e.g. on macOS) it is "unavailable".
+
+from __future__ import print_function
+
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+HARNESS = os.path.abspath(__file__)
+PACMAN_DIR = os.path.join(os.path.dirname(os.path.dirname(HARNESS)), "pacman_domain")
+SEARCHES = ["nrastar", "nrastar_adaptive", "lpastar", "dstarlite", "dstar", "astar"]
+FIELDS = ["layout", "search", "width", "height", "repeat", "status", "cost", "expanded",
+          "seconds_min", "seconds_median", "search_heap_kb"]
+MALLINFO_FIELDS = ["arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks", "fsmblks", "uordblks", "fordblks",
+                   "keepcost"]
+SAMPLE_INTERVAL = 0.0005  # seconds between samples of the heap; shorter-lived peaks can fall between two
+
+
+# ########  layouts  ########
+def load(name):
+    import layout
+
+    return layout.getLayout(name)  # also builds the generated maps (see mapGenerator.py)
+
+
+def pacman_start(lay):
+    return [position for is_pacman, position in lay.agentPositions if is_pacman][0]
+
+
+def goal_reachable(lay, goal=(1, 1)):
+    walls = lay.walls
+    frontier = [pacman_start(lay)]
+    seen = set(frontier)
+    while frontier:
+        x, y = frontier.pop()
+        for neighbor in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+            if not walls[neighbor[0]][neighbor[1]] and neighbor not in seen:
+                seen.add(neighbor)
+                frontier.append(neighbor)
+    return goal in seen
+
+
+# ########  memory  ########
+def heap_meter():
+    # a function returning the bytes the C allocator has handed out and not had back (in use from its arenas, plus
+    # the chunks it mapped separately), from glibc's mallinfo2 (or mallinfo, before glibc 2.33); None without glibc
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+    except (ImportError, OSError):
+        return None
+    for name, field_type in [("mallinfo2", ctypes.c_size_t), ("mallinfo", ctypes.c_int)]:
+        mallinfo = getattr(libc, name, None)
+        if mallinfo is not None:
+            mallinfo.restype = type("MallInfo", (ctypes.Structure,),
+                                    {"_fields_": [(field, field_type) for field in MALLINFO_FIELDS]})
+
+            def in_use(mallinfo=mallinfo):
+                info = mallinfo()
+                return info.uordblks + info.hblkhd
+
+            return in_use
+    return None
+
+
+def peak_heap_kb(in_use, run):
+    # calls run() while a thread samples in_use, and returns how far the heap rose above where it was before, in KB
+    gc.collect()
+    baseline = in_use()
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], in_use())
+            time.sleep(SAMPLE_INTERVAL)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        run()
+    finally:
+        done.set()
+        sampler.join()
+    return (max(peak[0], in_use()) - baseline) // 1024
+
+
+# ########  child: one (layout, search) pair  ########
+def run_once(lay, fn):
+    import pacman
+    import search
+    import searchAgents
+
+    random.seed(0)
+    state = pacman.GameState()
+    state.initialize(lay, 0)
+    if fn == "astar":
+        problem = searchAgents.PositionSearchProblem(state, warn=False, visualize=False)
+    else:
+        problem = searchAgents.ReplanningSearchProblem(state, warn=False, visualize=False)
+    began = time.time()
+    if fn == "astar" or fn.startswith("nrastar"):
+        actions = getattr(search, fn)(problem, heuristic=searchAgents.manhattanHeuristic)
+    else:
+        actions = getattr(search, fn)(problem)
+    seconds = time.time() - began
+    return problem.getCostOfActions(actions), problem._expanded, seconds
+
+
+def child(name, fn, repeat):
+    lay = load(name)
+    row = {"layout": name, "search": fn, "width": lay.width, "height": lay.height, "repeat": repeat}
+    if not goal_reachable(lay):
+        row["status"] = "unreachable"
+        return row
+
+    in_use = heap_meter()
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")  # the searches print progress; keep it out of the results
+    try:
+        runs = [run_once(lay, fn) for _ in range(repeat)]
+        if in_use is None:
+            row["search_heap_kb"] = "unavailable"  # rather than a blank, or zeros that would read as measured
+        else:
+            row["search_heap_kb"] = peak_heap_kb(in_use, lambda: run_once(lay, fn))  # untimed; sampling slows it
+    finally:
+        sys.stdout = stdout
+    if len(set((cost, expanded) for cost, expanded, _ in runs)) != 1:
+        row["status"] = "nondeterministic"  # would make the results incomparable; should never happen
+        return row
+
+    times = sorted(seconds for _, _, seconds in runs)
+    row.update({"status": "ok", "cost": runs[0][0], "expanded": runs[0][1],
+                "seconds_min": round(times[0], 4), "seconds_median": round(times[len(times) // 2], 4)})
+    return row
+
+
+# ########  parent: the whole suite  ########
+def commit():
+    try:
+        with open(os.devnull, "w") as devnull:
+            return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PACMAN_DIR,
+                                           stderr=devnull).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless pacman search benchmark")
+    parser.add_argument("--layouts", default=None, help="comma-separated layout names (default: every layouts/*.lay)")
+    parser.add_argument("--generated", default="field-40x40-25-0,field-60x60-25-1,maze-61x61-0,rooms-80x60-0",
+                        help="comma-separated generated maps, e.g. maze-101x101-0 (see mapGenerator.py)")
+    parser.add_argument("--searches", default=",".join(SEARCHES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--csv", default=None, help="write the results to this CSV file")
+    parser.add_argument("--json", default=None, help="write the results (plus run metadata) to this JSON file")
+    parser.add_argument("--child", nargs=3, metavar=("LAYOUT", "SEARCH", "REPEAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    csv_path, json_path = [os.path.abspath(path) if path else None for path in (args.csv, args.json)]
+
+    os.chdir(PACMAN_DIR)
+    sys.path.insert(0, PACMAN_DIR)
+    if args.child:
+        name, fn, repeat = args.child
+        print(json.dumps(child(name, fn, int(repeat)), sort_keys=True))
+        return
+
+    if args.layouts is None:
+        names = sorted(each[:-4] for each in os.listdir("layouts") if each.endswith(".lay"))
+    else:
+        names = args.layouts.split(",")
+    if args.generated:
+        names += args.generated.split(",")
+
+    env = dict(os.environ, PYTHONHASHSEED="0")
+    rows = []
+    print("%-20s %-16s %-12s %10s %10s %10s %10s %12s" % ("layout", "search", "status", "cost", "expanded",
+                                                          "sec (min)", "sec (med)", "heap KB"))
+    for name in names:
+        for fn in args.searches.split(","):
+            output = subprocess.check_output([sys.executable, HARNESS, "--child", name, fn, str(args.repeat)], env=env)
+            row = json.loads(output.decode().strip().splitlines()[-1])
+            rows.append(row)
+            print("%-20s %-16s %-12s %10s %10s %10s %10s %12s" % tuple(
+                row.get(field, "-") for field in ["layout", "search", "status", "cost", "expanded",
+                                                  "seconds_min", "seconds_median", "search_heap_kb"]))
+
+    if csv_path:
+        with open(csv_path, "w") as f:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+    if json_path:
+        meta = {"commit": commit(), "python": platform.python_version(), "repeat": args.repeat}
+        with open(json_path, "w") as f:
+            json.dump({"meta": meta, "results": rows}, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Compares queue pops and wall-clock time with the plain manhattan heuristic against the landmark (ALT) heuristic of
+# src/landmarks.py, for both planners, on pacman layouts and generated maps; e.g.
+#   python benchmarks/landmarks.py --maps mediumMaze,bigMaze,maze-101x101-0 --counts 4,8,16
+#
+# The planners are given the whole map up front (for ALT, it is the map the landmarks are taken on): LPA* searches once
+# from scratch, and D* Lite, which searches on construction, repairs its first plan with all the walls in one batch.
+# The landmark tables are built once per map and count; their build time and size are reported separately, as they are
+# paid once per layout rather than per search.
+
+import argparse
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "pacman_domain"))
+import mapGenerator
+from neighbor_tables import load_layout, parse_rows
+from src import d_star_lite as dsl
+from src import landmarks
+from src import lifelong_planning_a_star as lpa
+
+
+def load_map(name):
+    if mapGenerator.parseName(name) is not None:
+        return parse_rows(mapGenerator.generateText(name))
+    return load_layout(name)
+
+
+def run(module, resolution, walls, start, goal, heuristic_func):
+    # one search from scratch over the known map
+    if module is dsl:
+        planner = dsl.DStarLite(resolution, start, goal, heuristic_func=heuristic_func)
+        began = time.time()
+        planner.make_walls_at(sorted(walls))
+    else:
+        planner = lpa.LPAStar(resolution, start, goal, heuristic_func=heuristic_func)
+        for coord in sorted(walls):
+            planner.make_wall_at(coord)
+        began = time.time()
+    path = planner.extract_path()
+    return planner._pop_count, time.time() - began, len(path) - 1 if path else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark heuristic benchmark")
+    parser.add_argument("--maps", default="mediumMaze,bigMaze,contoursMaze,maze-101x101-0,rooms-101x101-0")
+    parser.add_argument("--counts", default="4,8,16", help="comma-separated numbers of landmarks")
+    parser.add_argument("--planners", default="lpastar,dstarlite")
+    args = parser.parse_args()
+
+    modules = {"lpastar": lpa, "dstarlite": dsl}
+    print("%-18s %-10s %-6s %10s %10s %10s %10s %8s" % ("map", "planner", "h", "pops", "seconds", "build s", "bytes",
+                                                        "length"))
+    for name in args.maps.split(","):
+        resolution, walls, start, goal = load_map(name)
+        grid = [[(x, y) in walls for y in range(resolution[1])] for x in range(resolution[0])]
+        heuristics = [("l1", None, 0, 0)]
+        for count in [int(each) for each in args.counts.split(",")]:
+            began = time.time()
+            heuristic = landmarks.LandmarkHeuristic(resolution, grid, count=count)
+            heuristics.append(("alt%d" % count, heuristic, time.time() - began, heuristic.nbytes()))
+        for planner_name in args.planners.split(","):
+            for label, heuristic, build, size in heuristics:
+                pops, seconds, length = run(modules[planner_name], resolution, walls, start, goal, heuristic)
+                print("%-18s %-10s %-6s %10d %10.3f %10.3f %10d %8s" % (name, planner_name, label, pops, seconds,
+                                                                         build, size, length))
+
+
+if __name__ == "__main__":
+    main()
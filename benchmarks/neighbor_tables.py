@@ -0,0 +1,106 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Measures planner throughput (queue pops per second) on bigMaze and on a synthetic 512x512 grid.
+# Pass --root to point at another checkout of this repository to compare against an older commit, e.g.
+#   git worktree add /tmp/before HEAD~1
+#   python benchmarks/neighbor_tables.py --root /tmp/before
+#   python benchmarks/neighbor_tables.py
+
+import argparse
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_layout(name):
+    # parses a pacman .lay file into (resolution, walls, start, goal), flipping y like layout.Layout does
+    with open(os.path.join(REPO_ROOT, "pacman_domain", "layouts", name + ".lay")) as f:
+        return parse_rows([line.rstrip("\n") for line in f if line.strip()])
+
+
+def parse_rows(rows):
+    # layout text (top row first) into (resolution, walls, start, goal)
+    width, height = len(rows[0]), len(rows)
+    walls, start, goal = set(), None, None
+    for row_index, row in enumerate(rows):
+        y = height - 1 - row_index
+        for x, char in enumerate(row):
+            if char == "%":
+                walls.add((x, y))
+            elif char == "P":
+                start = (x, y)
+            elif char == ".":
+                goal = (x, y)
+    return (width, height), walls, start, goal
+
+
+def synthetic_grid(size, density, seed):
+    rng = random.Random(seed)
+    start, goal = (0, 0), (size - 1, size - 1)
+    walls = set()
+    for x in range(size):
+        for y in range(size):
+            if rng.random() < density and (x, y) not in (start, goal):
+                walls.add((x, y))
+    return (size, size), walls, start, goal
+
+
+def run_lpa(lpa, resolution, walls, start, goal):
+    # LPA* with the whole map known up front; one search from scratch
+    planner = lpa.LPAStar(resolution, start, goal)
+    for coord in sorted(walls):
+        planner.make_wall_at(coord)
+    began = time.time()
+    path = planner.extract_path()
+    return planner._pop_count, time.time() - began, len(path) - 1 if path else None
+
+
+def run_dstarlite(dsl, resolution, walls, start, goal):
+    # D* Lite walking towards the goal, discovering walls in the four adjacent cells as it goes
+    began = time.time()
+    planner = dsl.DStarLite(resolution, start, goal)
+    width, height = resolution
+    position, steps = start, 0
+    while position != goal and steps < width * height:
+        x, y = position
+        for adjacent in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+            if adjacent in walls:
+                planner.make_wall_at(adjacent)
+        next_position = planner.take_step()
+        if next_position == position:
+            break  # no path
+        position, steps = next_position, steps + 1
+    return planner._pop_count, time.time() - began, steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planner throughput benchmark")
+    parser.add_argument("--root", default=REPO_ROOT, help="checkout whose src/ package is benchmarked")
+    parser.add_argument("--size", type=int, default=512, help="side length of the synthetic grid")
+    parser.add_argument("--density", type=float, default=0.2, help="obstacle density of the synthetic grid")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.root))
+    from src import d_star_lite as dsl
+    from src import lifelong_planning_a_star as lpa
+
+    maps = [("bigMaze", load_layout("bigMaze")),
+            ("synthetic%d" % args.size, synthetic_grid(args.size, args.density, args.seed))]
+    print("%-14s %-10s %10s %10s %12s %8s" % ("map", "planner", "pops", "seconds", "pops/sec", "length"))
+    for name, (resolution, walls, start, goal) in maps:
+        for planner_name, runner, module in [("lpastar", run_lpa, lpa), ("dstarlite", run_dstarlite, dsl)]:
+            pops, seconds, length = runner(module, resolution, walls, start, goal)
+            print("%-14s %-10s %10d %10.3f %12.0f %8s" % (name, planner_name, pops, seconds,
+                                                          pops / max(seconds, 1e-9), length))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Micro-benchmark of util.PriorityQueue, whose update used to scan the whole heap for the item and re-heapify it, against
+# the indexed queue that replaced it. Runs uniform cost search and A* on a PositionSearchProblem, and A* with
+# foodHeuristic on a FoodSearchProblem, with either queue; the paths and expansions must come out identical, only the
+# times differ. The queue is also timed alone, pushing and lowering the priorities of a given number of items, which
+# is where the size of the heap shows. Like the pacman domain itself, this runs under Python 2:
+#   python benchmarks/priority_queue.py --layouts bigMaze,mediumMaze --food-layouts trickySearch --repeat 3
+
+from __future__ import print_function
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+PACMAN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pacman_domain")
+sys.path.insert(0, PACMAN_DIR)
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+
+class LinearScanPriorityQueue(util.PriorityQueue):
+    # the queue as it was, for comparison: update is linear in the size of the heap
+    def __init__(self):
+        self.heap = []
+        self.count = 0
+
+    def push(self, item, priority):
+        entry = (priority, self.count, item)
+        heapq.heappush(self.heap, entry)
+        self.count += 1
+
+    def pop(self):
+        (_, _, item) = heapq.heappop(self.heap)
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def update(self, item, priority):
+        for index, (p, c, i) in enumerate(self.heap):
+            if i == item:
+                if p <= priority:
+                    break
+                del self.heap[index]
+                self.heap.append((priority, c, item))
+                heapq.heapify(self.heap)
+                break
+        else:
+            self.push(item, priority)
+
+
+QUEUES = [("linear", LinearScanPriorityQueue), ("indexed", util.PriorityQueue)]
+
+
+def game_state(name):
+    state = pacman.GameState()
+    state.initialize(layout.getLayout(name), 0)
+    return state
+
+
+def churn(queue, size, seed=0):
+    # the queue alone: size items pushed, each lowered twice, then all popped; returns the pop order and the time
+    rng = random.Random(seed)
+    priorities = [rng.randint(size, 4 * size) for _ in range(size)]
+    began = time.time()
+    fringe = queue()
+    for item, priority in enumerate(priorities):
+        fringe.update(item, priority)
+    for _ in range(2):
+        for item in rng.sample(range(size), size):
+            priorities[item] -= rng.randint(0, size // 2)
+            fringe.update(item, priorities[item])
+    order = []
+    while not fringe.isEmpty():
+        order.append(fringe.pop())
+    return order, time.time() - began
+
+
+def run(queue, make_problem, search_function, repeat):
+    # the best of repeat runs with util.PriorityQueue swapped for queue
+    original = util.PriorityQueue
+    util.PriorityQueue = queue
+    try:
+        best = None
+        for _ in range(repeat):
+            problem = make_problem()
+            began = time.time()
+            actions = search_function(problem)
+            seconds = time.time() - began
+            best = seconds if best is None else min(best, seconds)
+        return len(actions), problem._expanded, best
+    finally:
+        util.PriorityQueue = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Priority queue micro-benchmark")
+    parser.add_argument("--layouts", default="mediumMaze,bigMaze,openMaze")
+    parser.add_argument("--food-layouts", default="tinySearch,smallSearch,trickySearch")
+    parser.add_argument("--sizes", default="1000,2000,4000", help="comma-separated item counts for the queue alone")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    os.chdir(PACMAN_DIR)  # layouts are looked up relative to it
+
+    cases = []
+    for name in args.layouts.split(","):
+        state = game_state(name)
+        make_problem = lambda state=state: searchAgents.PositionSearchProblem(state, warn=False, visualize=False)
+        cases.append((name, "ucs", make_problem, search.uniformCostSearch))
+        cases.append((name, "astar", make_problem, lambda problem: search.aStarSearch(
+            problem, searchAgents.manhattanHeuristic)))
+    for name in args.food_layouts.split(","):
+        state = game_state(name)
+        cases.append((name, "astar-food", lambda state=state: searchAgents.FoodSearchProblem(state),
+                      lambda problem: search.aStarSearch(problem, searchAgents.foodHeuristic)))
+
+    print("%-14s %-11s %6s %9s %10s %10s %8s" % ("layout", "search", "cost", "expanded", "linear s", "indexed s",
+                                                 "speedup"))
+    for name, search_name, make_problem, search_function in cases:
+        results = [run(queue, make_problem, search_function, args.repeat) for _, queue in QUEUES]
+        (cost, expanded, linear), (indexed_cost, indexed_expanded, indexed) = results
+        assert (cost, expanded) == (indexed_cost, indexed_expanded), "the queues disagree on " + name
+        print("%-14s %-11s %6d %9d %10.3f %10.3f %7.1fx" % (name, search_name, cost, expanded, linear, indexed,
+                                                            linear / max(indexed, 1e-9)))
+    for size in [int(each) for each in args.sizes.split(",")]:
+        (order, linear), (indexed_order, indexed) = [churn(queue, size) for _, queue in QUEUES]
+        assert order == indexed_order, "the queues disagree on %d items" % size
+        print("%-14s %-11s %6s %9d %10.3f %10.3f %7.1fx" % ("-", "queue only", "-", size, linear, indexed,
+                                                            linear / max(indexed, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Profiles compute_shortest_path of both planners on pacman layouts, once with keys compared as plain tuples and once
+# with the checking _tuple_lt (lifelong_planning_a_star.VALIDATE_KEYS), and reports how much of its time the key
+# comparisons take; e.g.
+#   python benchmarks/profile_planners.py --layouts bigMaze --repeat 5 --top 10
+#
+# LPA* searches once over the known map; D* Lite walks to the goal discovering walls, as in connectivity.py.
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+from connectivity import run_dstarlite, run_lpa
+from neighbor_tables import load_layout
+from src import lifelong_planning_a_star as lpa
+
+KEY_FUNCTIONS = ("_tuple_lt", "top_keys", "peek")
+
+
+def profile(runner, resolution, walls, start, goal, repeat):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(repeat):
+        runner(resolution, walls, start, goal, 4)
+    profiler.disable()
+    return pstats.Stats(profiler)
+
+
+def totals(stats):
+    # (cumulative seconds in compute_shortest_path, seconds in the key comparisons and queue peeks)
+    search = keys = 0
+    for (_, _, name), (_, _, _, cumulative, _) in stats.stats.items():
+        if name == "compute_shortest_path":
+            search += cumulative
+        elif name in KEY_FUNCTIONS:
+            keys += cumulative
+    return search, keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planner inner loop profile")
+    parser.add_argument("--layouts", default="bigMaze")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also print the top functions by own time")
+    args = parser.parse_args()
+
+    print("%-12s %-10s %-10s %12s %12s %8s" % ("layout", "planner", "keys", "search s", "compare s", "share"))
+    for name in args.layouts.split(","):
+        resolution, walls, start, goal = load_layout(name)
+        for planner_name, runner in [("lpastar", run_lpa), ("dstarlite", run_dstarlite)]:
+            for validate in [True, False]:
+                lpa.VALIDATE_KEYS = validate
+                stats = profile(runner, resolution, walls, start, goal, args.repeat)
+                search, keys = totals(stats)
+                print("%-12s %-10s %-10s %12.3f %12.3f %7.1f%%" % (name, planner_name,
+                                                                    "_tuple_lt" if validate else "tuple", search, keys,
+                                                                    100.0 * keys / max(search, 1e-9)))
+                if args.top:
+                    stats.sort_stats("tottime").print_stats(args.top)
+    lpa.VALIDATE_KEYS = False
+
+
+if __name__ == "__main__":
+    main()
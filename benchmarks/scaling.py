@@ -0,0 +1,83 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Scaling curves: queue pops, wall-clock time and peak memory against the number of cells, for both planners on the
+# procedurally generated maps of pacman_domain/mapGenerator.py. The maps are streamed straight into the planners, so
+# sizes far beyond the bundled layouts need no .lay files; e.g.
+#   python benchmarks/scaling.py --sizes 64,128,256,512 --kinds maze,rooms,field --csv scaling.csv
+#
+# Every run is done twice: once untimed under tracemalloc for the peak memory (planner construction included), and
+# once without it for the time, which tracing would inflate.
+
+import argparse
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "pacman_domain"))
+import mapGenerator
+from neighbor_tables import parse_rows, run_dstarlite, run_lpa
+from src import d_star_lite as dsl
+from src import lifelong_planning_a_star as lpa
+
+FIELDS = ["map", "planner", "cells", "pops", "seconds", "peak_kb", "length"]
+
+
+def map_name(kind, size, density, seed):
+    if kind == "field":
+        return "field-%dx%d-%g-%d" % (size, size, density, seed)
+    return "%s-%dx%d-%d" % (kind, size, size, seed)
+
+
+def measure(runner, module, resolution, walls, start, goal):
+    tracemalloc.start()
+    runner(module, resolution, walls, start, goal)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    pops, seconds, length = runner(module, resolution, walls, start, goal)
+    return pops, seconds, peak // 1024, length
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planner scaling benchmark")
+    parser.add_argument("--sizes", default="64,128,256,512", help="comma-separated side lengths of the maps")
+    parser.add_argument("--kinds", default="maze,rooms,field", help="comma-separated map kinds (see mapGenerator.py)")
+    parser.add_argument("--density", type=float, default=25, help="wall percentage of the field maps")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--planners", default="lpastar,dstarlite")
+    parser.add_argument("--csv", default=None, help="write the results to this CSV file")
+    args = parser.parse_args()
+
+    runners = {"lpastar": (run_lpa, lpa), "dstarlite": (run_dstarlite, dsl)}
+    rows = []
+    print("%-22s %-10s %10s %10s %10s %10s %8s" % ("map", "planner", "cells", "pops", "seconds", "peak KB", "length"))
+    for size in [int(each) for each in args.sizes.split(",")]:
+        for kind in args.kinds.split(","):
+            name = map_name(kind, size, args.density, args.seed)
+            resolution, walls, start, goal = parse_rows(mapGenerator.generateText(name))
+            for planner_name in args.planners.split(","):
+                runner, module = runners[planner_name]
+                pops, seconds, peak, length = measure(runner, module, resolution, walls, start, goal)
+                row = dict(zip(FIELDS, [name, planner_name, size * size, pops, round(seconds, 4), peak, length]))
+                rows.append(row)
+                print("%-22s %-10s %10d %10d %10.3f %10d %8s" % tuple(row[field] for field in FIELDS))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Compares queue pops (nodes expanded) and travelled path length against the wall-sensor radius, for the
+# replanning searches on the bundled pacman layouts. Like the pacman domain itself, this runs under Python 2:
+#   python benchmarks/sensor_radius.py --layouts mediumMaze,bigMaze --radii 1,2,3,5
+#
+# The 'fov' sensor sees every wall in line of sight however far, so it is run once per layout, whatever the radii.
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+
+PACMAN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pacman_domain")
+
+
+def run(search, searchAgents, layout, fn, radius, sensor):
+    import pacman
+
+    state = pacman.GameState()
+    state.initialize(layout, 0)
+    problem = searchAgents.ReplanningSearchProblem(state, warn=False, visualize=False,
+                                                   sensorRadius=radius, sensor=sensor)
+    if fn == "nrastar":
+        actions = search.naiveReplanningAStarSearch(problem, searchAgents.manhattanHeuristic)
+    else:
+        actions = getattr(search, fn)(problem)
+    return problem._expanded, problem.getCostOfActions(actions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensor radius benchmark")
+    parser.add_argument("--layouts", default="smallMaze,mediumMaze,bigMaze,openMaze")
+    parser.add_argument("--radii", default="1,2,3,5")
+    parser.add_argument("--sensors", default="manhattan,los,fov")
+    parser.add_argument("--searches", default="nrastar,lpastar,dstarlite")
+    args = parser.parse_args()
+
+    os.chdir(PACMAN_DIR)
+    sys.path.insert(0, PACMAN_DIR)
+    import layout
+    import search
+    import searchAgents
+
+    radii = [int(r) for r in args.radii.split(",")]
+    print("%-12s %-10s %6s %-10s %8s %8s" % ("layout", "sensor", "radius", "search", "pops", "length"))
+    for name in args.layouts.split(","):
+        lay = layout.getLayout(name)
+        for sensor in args.sensors.split(","):
+            for radius in (radii[:1] if sensor == "fov" else radii):
+                for fn in args.searches.split(","):
+                    pops, length = run(search, searchAgents, lay, fn, radius, sensor)
+                    print("%-12s %-10s %6s %-10s %8d %8d" % (name, sensor, "-" if sensor == "fov" else radius, fn,
+                                                             pops, length))
+
+
+if __name__ == "__main__":
+    main()
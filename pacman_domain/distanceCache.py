@@ -0,0 +1,157 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Maze distances, cached per layout. The first distance asked for from a source cell runs one breadth-first search from
+# it, which yields a distance field (the distance from that source to every cell); any later distance from the same
+# source is a lookup. The fields are kept in memory up to a bound, least recently used first out, and with a cache
+# directory (the PACMAN_DISTANCE_CACHE environment variable, or getCache's directory argument) they are also written to
+# an all-pairs file per layout that is memory mapped, so that other processes on the same layout find them there.
+# Like mapGenerator.py, this module also runs under Python 3.
+
+import array
+import collections
+import hashlib
+import mmap
+import os
+import struct
+
+UNREACHABLE = -1  # in a distance field; distance() returns infinity instead
+DEFAULT_CAPACITY = 256  # distance fields kept in memory per layout
+MAX_LAYOUTS = 8  # layouts whose caches are kept in memory
+MAX_MAPPED_CELLS = 4096  # an all-pairs file holds cells * cells entries, so only layouts up to this size are mapped
+CACHE_DIRECTORY = os.environ.get('PACMAN_DISTANCE_CACHE')
+
+_caches = collections.OrderedDict()  # (width, height, hash of the walls) -> DistanceCache, least recently used first
+_last = (None, None)  # the walls last asked for and their cache, so that repeated calls skip hashing the grid
+
+
+def getCache(walls, directory=None):
+    """
+    Returns the DistanceCache of a wall Grid (game.py), making it if needed.
+    The walls must not change afterwards; layouts' walls do not.
+    """
+    global _last
+    if _last[0] is walls:
+        return _last[1]
+    key = (walls.width, walls.height, hash(walls))
+    cache = _caches.pop(key, None)
+    if cache is None or not (cache.walls == walls):  # not !=, which Python 2 only defines if the grid defines __ne__
+        cache = DistanceCache(walls, directory=directory or CACHE_DIRECTORY)
+    _caches[key] = cache
+    while len(_caches) > MAX_LAYOUTS:
+        _caches.popitem(last=False)
+    _last = (walls, cache)
+    return cache
+
+
+class DistanceCache:
+    """
+    The maze distances of one layout; see the top of this file.
+    """
+
+    def __init__(self, walls, capacity=DEFAULT_CAPACITY, directory=None):
+        self.walls = walls.copy()
+        self.width, self.height = walls.width, walls.height
+        self.cells = self.width * self.height
+        self.open = bytearray(not walls[x][y] for x in range(self.width) for y in range(self.height))
+        self.capacity = capacity
+        self.fields = collections.OrderedDict()  # source cell -> distance field, least recently used first
+        self.lastSource, self.lastField = None, None
+        self.mapped = None
+        if directory and self.cells <= MAX_MAPPED_CELLS:
+            self.mapped = self._map(directory)
+
+    def distance(self, source, target):
+        """
+        The length of the shortest path between two cells, or infinity if there
+        is none.
+        """
+        sourceCell = source[0] * self.height + source[1]
+        targetCell = target[0] * self.height + target[1]
+        if sourceCell == self.lastSource:
+            value = self.lastField[targetCell]
+        elif self.mapped is not None and self._read(sourceCell * self.cells + sourceCell):
+            value = self._read(sourceCell * self.cells + targetCell) - 1  # straight from the file; see _store
+        else:
+            value = self.field(source)[targetCell]
+        return float('inf') if value == UNREACHABLE else value
+
+    def field(self, source):
+        """
+        The distance field of a source cell: an array of the distance to each
+        cell, indexed by x * height + y, with UNREACHABLE for walls and cells
+        that cannot be reached.
+        """
+        sourceCell = source[0] * self.height + source[1]
+        if sourceCell == self.lastSource:
+            return self.lastField
+        field = self.fields.pop(sourceCell, None)
+        if field is None:
+            field = self._load(sourceCell)
+        if field is None:
+            field = self._search(sourceCell)
+            self._store(sourceCell, field)
+        self.fields[sourceCell] = field
+        while len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        self.lastSource, self.lastField = sourceCell, field
+        return field
+
+    def _search(self, source):
+        # breadth-first search over the 4-connected open cells; the source itself counts as open
+        field = array.array('i', [UNREACHABLE]) * self.cells
+        field[source] = 0
+        height, cells, isOpen = self.height, self.cells, self.open
+        frontier = [source]
+        for cell in frontier:
+            step = field[cell] + 1
+            y = cell % height
+            for neighbor in (cell + height, cell - height, cell + 1 if y + 1 < height else -1, cell - 1 if y else -1):
+                if 0 <= neighbor < cells and isOpen[neighbor] and field[neighbor] == UNREACHABLE:
+                    field[neighbor] = step
+                    frontier.append(neighbor)
+        return field
+
+    # ########  the all-pairs file  ########
+    def _map(self, directory):
+        # one row of int32 entries per source cell; rows that were never searched are all zeros (and sparse on disk)
+        text = '%d %d\n%s' % (self.width, self.height, self.walls)
+        path = os.path.join(directory, hashlib.sha1(text.encode('ascii')).hexdigest() + '.dist')
+        size = self.cells * self.cells * 4
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            return mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def _read(self, index):
+        return struct.unpack_from('i', self.mapped, index * 4)[0]
+
+    def _load(self, source):
+        if self.mapped is None or not self._read(source * self.cells + source):
+            return None
+        stored = array.array('i')
+        data = self.mapped[source * self.cells * 4:(source + 1) * self.cells * 4]
+        if hasattr(stored, 'frombytes'):
+            stored.frombytes(data)
+        else:
+            stored.fromstring(data)  # python 2
+        return array.array('i', [value - 1 for value in stored])
+
+    def _store(self, source, field):
+        # entries are stored one up, so that 0 means "not searched yet"; the source's own entry (1 once searched) is
+        # written last, so that another process never takes a row that is still being written for complete
+        if self.mapped is None:
+            return
+        stored = array.array('i', [value + 1 for value in field])
+        stored[source] = 0
+        data = stored.tobytes() if hasattr(stored, 'tobytes') else stored.tostring()  # python 2
+        self.mapped[source * self.cells * 4:(source + 1) * self.cells * 4] = data
+        struct.pack_into('i', self.mapped, (source * self.cells + source) * 4, 1)
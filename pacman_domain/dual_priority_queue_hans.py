@@ -9,80 +9,229 @@
 # https://doi.org/10.1109/ROBOT.2002.1013481
 #
 
+# imports
+import heapq
+
+# global variables
+Removed = object()  # placeholder key for heap entries that have been lazily invalidated
+
 
 class DualPriorityQueue:
+    # binary heap ordered lexicographically by (primary, secondary); ties on both fall back to insertion order
     def __init__(self):
         self._size = 0
-        self._ledger = dict()  # maps keys to priority tuples
-        self._priority = dict()  # maps primary priorities to keys
-        self._min_value = None
-        self._min_count = 0
+        self._heap = []  # heap of [primary, secondary, insertion_count, key] entries
+        self._ledger = dict()  # maps keys to their live heap entry
+        self._primary_count = dict()  # maps primary priorities to the number of live keys holding them
+        self._counter = 0  # monotonic insertion count; keeps equal priorities stable (FIFO)
 
     def size(self):
         return self._size
 
+    def clear(self):
+        # empties the queue in place, as if just made, so that a planner can reuse it for its next search
+        self._size = 0
+        del self._heap[:]
+        self._ledger.clear()
+        self._primary_count.clear()
+        self._counter = 0
+
     def min_state(self):
-        return self._min_value, self._min_count
+        top = self._peek_entry()
+        if top is None:
+            return None, 0
+        return top[0], self._primary_count[top[0]]
 
     def push(self, key, primary, secondary):
         if key in self._ledger:
             self.delete_key(key)  # if a key is pushed twice, update it to the new value (?)
 
-        self._ledger[key] = (primary, secondary)
-        if primary not in self._priority:
-            self._priority[primary] = []
-        self._priority[primary].append(key)
+        entry = [primary, secondary, self._counter, key]
+        self._counter += 1
+        self._ledger[key] = entry
+        heapq.heappush(self._heap, entry)
+        self._primary_count[primary] = self._primary_count.get(primary, 0) + 1
         self._size += 1
-        if self._min_value is None or primary < self._min_value:
-            self._min_value = primary
-            self._min_count = 1
-        elif primary == self._min_value:
-            self._min_count += 1
 
     def delete_key(self, key):
-        if key in self._ledger:
-            # clean up the data first
-            old_primary, old_secondary = self._ledger[key]
-            self._size -= 1
-            del self._ledger[key]
-            self._priority[old_primary].remove(key)
-            if len(self._priority[old_primary]) == 0:
-                del self._priority[old_primary]  # remove the dangling empty priority
-
-            # can be expensive [O(n)] to recompute the min, so be smart about it
-            if old_primary == self._min_value:
-                self._min_count -= 1
-                if self._min_count == 0:
-                    self._compute_min()  # only compute if we've exhausted the current min-priority tier
-
-    def _compute_min(self):
-        if self.size() == 0:
-            self._min_count = 0
-            self._min_value = None
-        else:
-            priority_list = list(self._priority.keys())
-            self._min_value = min(priority_list)
-            self._min_count = priority_list.count(self._min_value)
+        entry = self._ledger.pop(key, None)
+        if entry is None:
+            return
+
+        # lazy invalidation; the stale entry is discarded when it surfaces at the top of the heap
+        entry[-1] = Removed
+        self._forget(entry[0])
+
+        # don't let stale entries dominate the heap on long-running searches
+        if len(self._heap) > 2 * self._size + 64:
+            self._compact()
+
+    def _forget(self, primary):
+        self._size -= 1
+        self._primary_count[primary] -= 1
+        if self._primary_count[primary] == 0:
+            del self._primary_count[primary]  # remove the dangling empty priority
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[-1] is not Removed]
+        heapq.heapify(self._heap)
+
+    def _peek_entry(self):
+        heap = self._heap
+        while heap and heap[0][-1] is Removed:
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        return heap[0]
 
     def peek(self):
-        if self.size() <= 0:
+        top = self._peek_entry()
+        if top is None:
             return None  # nothing to pop
+        return top[3], top[0], top[1]
 
-        # find and break the ties
-        candidate_keys = self._priority[self._min_value]
-        result = []
-        for each in candidate_keys:
-            primary, secondary = self._ledger[each]
-            result.append((each, primary, secondary))
-        result.sort(key=lambda x: x[2])  # sort the list by the secondary priority
-        result = result[0]
-
-        return result
+    def top_keys(self):
+        # the (primary, secondary) priority of the next pop, as a tuple that compares like the priorities do
+        top = self._peek_entry()
+        if top is None:
+            return None  # nothing to pop
+        return top[0], top[1]
 
     def pop(self):
-        result = self.peek()
-        if result is not None:
-            self.delete_key(result[0])  # remove and clean up
-        return result
+        top = self._peek_entry()
+        if top is None:
+            return None  # nothing to pop
+        heapq.heappop(self._heap)  # the live top entry can be removed outright, no invalidation needed
+        primary, secondary, _, key = top
+        del self._ledger[key]
+        self._forget(primary)
+        return key, primary, secondary
+
+
+class BucketPriorityQueue:
+    # circular array of buckets indexed by integer primary priority; for unit-cost grids with integral heuristics
+    # each bucket is a small heap on (secondary, insertion_count), so the ordering matches DualPriorityQueue exactly
+    def __init__(self, span):
+        self._size = 0
+        self._span = max(int(span), 1)  # number of buckets; grows if live primaries spread further apart
+        self._buckets = [[] for _ in range(self._span)]
+        self._live = [0] * self._span  # number of live keys in each bucket
+        self._ledger = dict()  # maps keys to their live bucket entry
+        self._counter = 0  # monotonic insertion count; keeps equal priorities stable (FIFO)
+        self._low = None  # no live key has a smaller primary than this
+        self._high = None  # no live key has a larger primary than this
+
+    def size(self):
+        return self._size
+
+    def clear(self):
+        # empties the queue in place, as if just made (but keeping any span it has grown to), for the next search
+        self._size = 0
+        for index in range(self._span):
+            del self._buckets[index][:]
+            self._live[index] = 0
+        self._ledger.clear()
+        self._counter = 0
+        self._low, self._high = None, None
 
+    def min_state(self):
+        top = self._peek_entry()
+        if top is None:
+            return None, 0
+        return top[3], self._live[top[4] % self._span]
+
+    def push(self, key, primary, secondary):
+        slot = int(primary)  # integral floats (e.g. read back from a double buffer) are fine
+        if slot != primary:
+            raise ValueError("Bucketed priorities must be integers: {0}".format(primary))
+        if key in self._ledger:
+            self.delete_key(key)  # if a key is pushed twice, update it to the new value
+
+        if self._size == 0:
+            self._low, self._high = slot, slot
+        else:
+            self._low, self._high = min(self._low, slot), max(self._high, slot)
+            if self._high - self._low >= self._span:
+                self._rebucket(slot)
+
+        entry = [secondary, self._counter, key, primary, slot]
+        self._counter += 1
+        self._ledger[key] = entry
+        index = slot % self._span
+        heapq.heappush(self._buckets[index], entry)
+        self._live[index] += 1
+        self._size += 1
+
+    def delete_key(self, key):
+        entry = self._ledger.pop(key, None)
+        if entry is None:
+            return
+
+        # lazy invalidation; the stale entry is discarded when it surfaces, or when its bucket empties
+        entry[2] = Removed
+        index = entry[4] % self._span
+        self._forget(index)
+        bucket = self._buckets[index]
+        if len(bucket) > 2 * self._live[index] + 16:
+            self._buckets[index] = [each for each in bucket if each[2] is not Removed]
+            heapq.heapify(self._buckets[index])
 
+    def _forget(self, index):
+        self._size -= 1
+        self._live[index] -= 1
+        if self._live[index] == 0:
+            self._buckets[index] = []  # drop any stale entries along with the bucket
+        if self._size == 0:
+            self._low, self._high = None, None
+
+    def _rebucket(self, incoming):
+        # the bounds are conservative after deletions, so tighten them before deciding to grow
+        primaries = [entry[4] for entry in self._ledger.values()]
+        primaries.append(incoming)
+        self._low, self._high = min(primaries), max(primaries)
+        spread = self._high - self._low + 1
+        if spread <= self._span:
+            return
+
+        self._span = max(spread, 2 * self._span)
+        self._buckets = [[] for _ in range(self._span)]
+        self._live = [0] * self._span
+        for entry in self._ledger.values():
+            index = entry[4] % self._span
+            self._buckets[index].append(entry)
+            self._live[index] += 1
+        for bucket in self._buckets:
+            heapq.heapify(bucket)
+
+    def _peek_entry(self):
+        if self._size == 0:
+            return None
+        while self._live[self._low % self._span] == 0:
+            self._low += 1  # every live primary lies in [low, high], so this stops within one lap
+        bucket = self._buckets[self._low % self._span]
+        while bucket[0][2] is Removed:
+            heapq.heappop(bucket)
+        return bucket[0]
+
+    def peek(self):
+        top = self._peek_entry()
+        if top is None:
+            return None  # nothing to pop
+        return top[2], top[3], top[0]
+
+    def top_keys(self):
+        top = self._peek_entry()
+        if top is None:
+            return None  # nothing to pop
+        return top[3], top[0]
+
+    def pop(self):
+        top = self._peek_entry()
+        if top is None:
+            return None  # nothing to pop
+        index = top[4] % self._span
+        heapq.heappop(self._buckets[index])
+        secondary, _, key, primary, _ = top
+        del self._ledger[key]
+        self._forget(index)
+        return key, primary, secondary
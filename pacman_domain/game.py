@@ -22,6 +22,8 @@
 
 from util import *
 import time, os
+import binascii
+import string
 import traceback
 import sys
 
@@ -161,9 +163,14 @@ class AgentState:
 
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.  Data is accessed
-    via grid[x][y] where (x,y) are positions on a Pacman map with x horizontal,
-    y vertical and the origin (0,0) in the bottom left corner.
+    A 2-dimensional array of booleans backed by one bytearray per column.  Data is
+    accessed via grid[x][y] where (x,y) are positions on a Pacman map with x horizontal,
+    y vertical and the origin (0,0) in the bottom left corner.  Cells read back as 1
+    or 0, which compare equal to True and False.
+
+    Whole-grid operations (hashing, comparing, copying, counting, and the bitwise
+    operators &, |, ^ and -) work on the columns' bytes at C speed rather than cell
+    by cell; _cells joins them into one flat string, cell (x,y) at offset x*height+y.
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
@@ -173,7 +180,7 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(height)] for x in range(width)]
+        self.data = [bytearray([initialValue]) * height for x in range(width)]
         if bitRepresentation:
             self._unpackBits(bitRepresentation)
 
@@ -181,30 +188,38 @@ class Grid:
         return self.data[i]
 
     def __setitem__(self, key, item):
-        self.data[key] = item
+        self.data[key] = bytearray(item)
 
     def __str__(self):
-        out = [[str(self.data[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out = [['T' if self.data[x][y] else 'F' for x in range(self.width)] for y in range(self.height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
 
     def __eq__(self, other):
-        if other == None: return False
-        return self.data == other.data
+        if other is None: return False
+        return self.height == other.height and self._cells() == other._cells()
+
+    def __ne__(self, other):
+        return not self == other
 
     def __hash__(self):
-        # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        return hash(self._cells())
+
+    def __and__(self, other):
+        return self._combine(other, lambda a, b: a & b)
+
+    def __or__(self, other):
+        return self._combine(other, lambda a, b: a | b)
+
+    def __xor__(self, other):
+        return self._combine(other, lambda a, b: a ^ b)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda a, b: a & ~b)
 
     def copy(self):
-        g = Grid(self.width, self.height)
+        g = Grid(0, 0)  # no columns to make, as they are filled in below
+        g.width, g.height = self.width, self.height
         g.data = [x[:] for x in self.data]
         return g
 
@@ -212,18 +227,21 @@ class Grid:
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
+        g = Grid(0, 0)
+        g.width, g.height = self.width, self.height
         g.data = self.data
         return g
 
     def count(self, item =True ):
-        return sum([x.count(item) for x in self.data])
+        trues = self._cells().count(_TRUE_CELL)
+        return trues if item else self.width * self.height - trues
 
     def asList(self, key = True):
         list = []
         for x in range(self.width):
+            column = self.data[x]
             for y in range(self.height):
-                if self[x][y] == key: list.append( (x,y) )
+                if column[y] == key: list.append( (x,y) )
         return list
 
     def packBits(self):
@@ -232,17 +250,12 @@ class Grid:
 
         (width, height, bitPackedInts...)
         """
+        digits = self._cells().translate(_CELL_TO_DIGIT)
         bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
+        for i in range(0, len(digits), self.CELLS_PER_INT):
+            bits.append(int(digits[i:i + self.CELLS_PER_INT].ljust(self.CELLS_PER_INT, '0'), 2))
+        if len(digits) % self.CELLS_PER_INT == 0:
+            bits.append(0)
         return tuple(bits)
 
     def _cellIndexToPosition(self, index):
@@ -250,29 +263,40 @@ class Grid:
         y = index % self.height
         return x, y
 
+    def _cells(self):
+        # every cell, one byte each, as a (hashable) string
+        return str(bytearray().join(self.data))
+
+    def _setCells(self, cells):
+        self.data = [bytearray(cells[x * self.height:(x + 1) * self.height]) for x in range(self.width)]
+
+    def _combine(self, other, op):
+        # applies op to the two grids as big ints of one byte per cell; as each byte is 0 or 1, so is the result's
+        if (self.width, self.height) != (other.width, other.height):
+            raise ValueError, "grids of different sizes cannot be combined"
+        size = self.width * self.height
+        if size == 0:
+            return self.copy()
+        a, b = [int(binascii.hexlify(g._cells()), 16) for g in (self, other)]
+        g = Grid(0, 0)
+        g.width, g.height = self.width, self.height
+        g._setCells(binascii.unhexlify('%0*x' % (2 * size, op(a, b))))
+        return g
+
     def _unpackBits(self, bits):
         """
         Fills in data from a bit-level representation
         """
-        cell = 0
+        digits = []
         for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height: break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
-
-    def _unpackInt(self, packed, size):
-        bools = []
-        if packed < 0: raise ValueError, "must be a positive integer"
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+            if packed < 0: raise ValueError, "must be a positive integer"
+            digits.append(format(packed, '0%db' % self.CELLS_PER_INT)[-self.CELLS_PER_INT:])
+        cells = ''.join(digits)[:self.width * self.height].translate(_DIGIT_TO_CELL)
+        self._setCells(cells.ljust(self.width * self.height, _FALSE_CELL))
+
+_TRUE_CELL, _FALSE_CELL = chr(1), chr(0)
+_CELL_TO_DIGIT = string.maketrans(_FALSE_CELL + _TRUE_CELL, '01')
+_DIGIT_TO_CELL = string.maketrans('01', _FALSE_CELL + _TRUE_CELL)
 
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
@@ -434,7 +458,7 @@ class GameStateData:
 
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
-        map = Grid(width, height)
+        map = [[' '] * height for x in range(width)]
         if type(self.food) == type((1,2)):
             self.food = reconstituteGrid(self.food)
         for x in range(width):
@@ -455,7 +479,9 @@ class GameStateData:
         for x, y in self.capsules:
             map[x][y] = 'o'
 
-        return str(map) + ("\nScore: %d\n" % self.score)
+        rows = [''.join([map[x][y] for x in range(width)]) for y in range(height)]
+        rows.reverse()
+        return '\n'.join(rows) + ("\nScore: %d\n" % self.score)
 
     def _foodWallStr( self, hasFood, hasWall ):
         if hasFood:
@@ -14,10 +14,96 @@
 
 from util import manhattanDistance
 from game import Grid
+import math
 import os
 import random
 
-VISIBILITY_MATRIX_CACHE = {}
+VISIBILITY_MATRIX_CACHE = {}  # (width, height, hash of the wall bits) -> VisibilityMatrix
+
+def packCells(grid):
+    """
+    Returns the cells of a boolean grid as an int, with bit x * height + y
+    set for each true cell (x, y).
+    """
+    digits = ['1' if cell else '0' for column in reversed(grid.data) for cell in reversed(column)]
+    return int(''.join(digits) or '0', 2)
+
+def inLineOfSight(walls, fromPos, toPos):
+    """
+    Returns whether no wall (walls[x][y]) lies strictly between the two
+    positions, along the Bresenham line from fromPos to toPos.
+    """
+    x, y = fromPos
+    x1, y1 = toPos
+    dx, dy = abs(x1 - x), abs(y1 - y)
+    sx, sy = (1 if x1 > x else -1), (1 if y1 > y else -1)
+    err = dx - dy
+    while True:
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+        if x == x1 and y == y1:
+            return True
+        if walls[x][y]:
+            return False
+
+class VisibilityMatrix:
+    """
+    Line-of-sight visibility between the cells of one set of walls. Cell
+    (x, y) is numbered x * height + y, and the row of a cell is a bitset (an
+    int) with the bit of every cell that can be seen from it set: those with
+    no wall strictly between the two, along the Bresenham line, as with the
+    'los' sensor of ReplanningSearchProblem. Rows are computed on first use
+    and kept, as the matrix is shared by every layout with these walls.
+    """
+
+    def __init__(self, walls, wallBits):
+        self.width = walls.width
+        self.height = walls.height
+        self.wallBits = wallBits
+        self.walls = [column[:] for column in walls.data]
+        self.rows = [None] * (self.width * self.height)
+
+    def row(self, pos):
+        x, y = pos
+        cell = x * self.height + y
+        bits = self.rows[cell]
+        if bits is None:
+            bits = self.rows[cell] = self.castRow(x, y)
+        return bits
+
+    def isVisible(self, fromPos, toPos):
+        x, y = toPos
+        bits = self.rows[fromPos[0] * self.height + fromPos[1]]
+        if bits is None:
+            return inLineOfSight(self.walls, fromPos, toPos)  # one line is much cheaper than the whole row
+        return (bits >> (x * self.height + y)) & 1 == 1
+
+    def wallsInView(self, pos):
+        """
+        Returns every wall that can be seen from pos, however far.
+        """
+        return self.unpackCells(self.row(pos) & self.wallBits)
+
+    def unpackCells(self, bits):
+        cells = []
+        while bits:
+            low = bits & -bits
+            cell = low.bit_length() - 1
+            cells.append((cell // self.height, cell % self.height))
+            bits ^= low
+        return cells
+
+    def castRow(self, x0, y0):
+        # one line to every cell; each stops at the first wall in the way, which in a maze comes early
+        walls, origin = self.walls, (x0, y0)
+        digits = ['1' if inLineOfSight(walls, origin, (x1, y1)) else '0'
+                  for x1 in range(self.width - 1, -1, -1) for y1 in range(self.height - 1, -1, -1)]
+        return int(''.join(digits), 2)
 
 class Layout:
     """
@@ -35,31 +121,25 @@ class Layout:
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
-        # self.initializeVisibilityMatrix()
+        self.initializeVisibilityMatrix()
 
     def getNumGhosts(self):
         return self.numGhosts
 
     def initializeVisibilityMatrix(self):
+        """
+        Looks up the visibility matrix of these walls, or starts one. Layouts
+        with the same walls (e.g. the copies made for each game) share it, so
+        its rows are only computed once.
+        """
         global VISIBILITY_MATRIX_CACHE
-        if reduce(str.__add__, self.layoutText) not in VISIBILITY_MATRIX_CACHE:
-            from game import Directions
-            vecs = [(-0.5,0), (0.5,0),(0,-0.5),(0,0.5)]
-            dirs = [Directions.NORTH, Directions.SOUTH, Directions.WEST, Directions.EAST]
-            vis = Grid(self.width, self.height, {Directions.NORTH:set(), Directions.SOUTH:set(), Directions.EAST:set(), Directions.WEST:set(), Directions.STOP:set()})
-            for x in range(self.width):
-                for y in range(self.height):
-                    if self.walls[x][y] == False:
-                        for vec, direction in zip(vecs, dirs):
-                            dx, dy = vec
-                            nextx, nexty = x + dx, y + dy
-                            while (nextx + nexty) != int(nextx) + int(nexty) or not self.walls[int(nextx)][int(nexty)] :
-                                vis[x][y][direction].add((nextx, nexty))
-                                nextx, nexty = x + dx, y + dy
-            self.visibility = vis
-            VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)] = vis
-        else:
-            self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
+        wallBits = packCells(self.walls)
+        key = (self.width, self.height, hash(wallBits))
+        vis = VISIBILITY_MATRIX_CACHE.get(key)
+        if vis is None or vis.wallBits != wallBits:
+            vis = VisibilityMatrix(self.walls, wallBits)
+            VISIBILITY_MATRIX_CACHE[key] = vis
+        self.visibility = vis
 
     def isWall(self, pos):
         x, col = pos
@@ -83,8 +163,20 @@ class Layout:
         return pos
 
     def isVisibleFrom(self, ghostPos, pacPos, pacDirection):
-        row, col = [int(x) for x in pacPos]
-        return ghostPos in self.visibility[row][col][pacDirection]
+        """
+        Returns whether a ghost at ghostPos is in sight of pacman, looking
+        straight ahead in pacDirection from pacPos.
+        """
+        from game import Actions
+        x, y = [int(c) for c in pacPos]
+        dx, dy = Actions.directionToVector(pacDirection)
+        gx, gy = ghostPos
+        if (dx, dy) == (0, 0) or (gx - x) * dy != 0 or (gy - y) * dx != 0 or (gx - x) * dx + (gy - y) * dy <= 0:
+            return False
+        # a ghost between two cells is in sight if the one nearer to pacman is
+        nearx = int(math.floor(gx)) if dx >= 0 else int(math.ceil(gx))
+        neary = int(math.floor(gy)) if dy >= 0 else int(math.ceil(gy))
+        return self.visibility.isVisible((x, y), (nearx, neary))
 
     def __str__(self):
         return "\n".join(self.layoutText)
@@ -129,6 +221,9 @@ class Layout:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
 def getLayout(name, back = 2):
+    import mapGenerator
+    if mapGenerator.parseName(name) is not None:
+        return mapGenerator.generateLayout(name)
     if name.endswith('.lay'):
         layout = tryToLoad('layouts/' + name)
         if layout == None: layout = tryToLoad(name)
@@ -0,0 +1,175 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Procedural maps for scaling tests, far beyond the bundled layouts. Every map is generated in memory from a name,
+# which layout.getLayout understands wherever it would take a layout file name (e.g. pacman.py -l maze-201x201-0):
+#   maze-<width>x<height>-<seed>                    a perfect maze (recursive backtracker) on the odd cells
+#   rooms-<width>x<height>-<seed>                   rectangular rooms joined by corridors
+#   field-<width>x<height>-<wall percentage>-<seed> an open field with random obstacles
+# Pacman starts in the top right corner and the single food is at (1, 1), like the bundled mazes; the goal is always
+# reachable. The map text functions only need the standard library (and also run under Python 3), so the benchmarks
+# can stream the same maps straight into the planners in src/ without going through layout.Layout.
+
+import random
+
+KINDS = ('maze', 'rooms', 'field')
+MAX_FIELD_ATTEMPTS = 100
+
+
+def parseName(name):
+    """
+    Returns (kind, width, height, wall percentage, seed) for a generated map
+    name, or None if the name is not one.
+    """
+    parts = name.split('-')
+    if parts[0] not in KINDS or len(parts) != (4 if parts[0] == 'field' else 3):
+        return None
+    try:
+        width, height = [int(each) for each in parts[1].split('x')]
+        percentage = float(parts[2]) if parts[0] == 'field' else None
+        seed = int(parts[-1])
+    except ValueError:
+        return None
+    if width < 5 or height < 5:
+        raise ValueError('Generated maps must be at least 5x5: ' + name)
+    return parts[0], width, height, percentage, seed
+
+
+def generateText(name):
+    """
+    Returns the layout text (a list of rows, top row first) of a generated map.
+    """
+    kind, width, height, percentage, seed = parseName(name)
+    if kind == 'maze':
+        return mazeText(width, height, seed)
+    if kind == 'rooms':
+        return roomsText(width, height, seed)
+    return fieldText(width, height, percentage, seed)
+
+
+def generateLayout(name):
+    """
+    Returns a layout.Layout for a generated map, without writing a .lay file.
+    """
+    import layout  # deferred, so that this module does not need the rest of the pacman domain
+    return layout.Layout(generateText(name))
+
+
+# ########  map kinds  ########
+def mazeText(width, height, seed):
+    """
+    A perfect maze: the cells with odd coordinates are rooms, and a randomized
+    depth-first search knocks down the walls between them.
+    """
+    rng = random.Random(seed)
+    open = _grid(width, height)
+    right, top = (width - 2) | 1, (height - 2) | 1  # the furthest odd cell still inside the border
+    if right > width - 2: right -= 2
+    if top > height - 2: top -= 2
+    open[1][1] = True
+    stack = [(1, 1)]
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in ((0, 2), (2, 0), (0, -2), (-2, 0))
+                   if 1 <= x + dx <= right and 1 <= y + dy <= top and not open[x + dx][y + dy]]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        open[x + dx // 2][y + dy // 2] = True
+        open[x + dx][y + dy] = True
+        stack.append((x + dx, y + dy))
+    return _render(open, (right, top))
+
+
+def roomsText(width, height, seed):
+    """
+    Rooms and corridors: non-overlapping rectangular rooms, each joined to the
+    previous one by an L-shaped corridor; the corners are joined to the first and
+    last rooms the same way.
+    """
+    rng = random.Random(seed)
+    open = _grid(width, height)
+    centers = []
+    taken = []
+    for _ in range(max(1, width * height // 80)):
+        roomWidth, roomHeight = rng.randint(3, 10), rng.randint(3, 8)
+        if roomWidth > width - 4 or roomHeight > height - 4:
+            continue
+        x, y = rng.randint(2, width - roomWidth - 2), rng.randint(2, height - roomHeight - 2)
+        if any(x <= ox + ow and ox <= x + roomWidth and y <= oy + oh and oy <= y + roomHeight
+               for ox, oy, ow, oh in taken):
+            continue  # overlaps (or touches) another room
+        taken.append((x, y, roomWidth, roomHeight))
+        for cx in range(x, x + roomWidth):
+            for cy in range(y, y + roomHeight):
+                open[cx][cy] = True
+        centers.append((x + roomWidth // 2, y + roomHeight // 2))
+    start = (width - 2, height - 2)
+    waypoints = [(1, 1)] + centers + [start]
+    for (x1, y1), (x2, y2) in zip(waypoints, waypoints[1:]):
+        corner = (x2, y1) if rng.random() < 0.5 else (x1, y2)
+        _carve(open, (x1, y1), corner)
+        _carve(open, corner, (x2, y2))
+    return _render(open, start)
+
+
+def fieldText(width, height, percentage, seed):
+    """
+    An open field where each inner cell is a wall with the given probability (in
+    percent); redrawn from the same random stream until the food can be reached.
+    """
+    rng = random.Random(seed)
+    start = (width - 2, height - 2)
+    for _ in range(MAX_FIELD_ATTEMPTS):
+        open = _grid(width, height)
+        for x in range(1, width - 1):
+            for y in range(1, height - 1):
+                open[x][y] = rng.random() * 100 >= percentage
+        open[1][1] = open[start[0]][start[1]] = True
+        if _connected(open, start, (1, 1)):
+            return _render(open, start)
+    raise ValueError('No connected field found in %d attempts; lower the wall percentage' % MAX_FIELD_ATTEMPTS)
+
+
+# ########  helpers  ########
+def _grid(width, height):
+    return [[False] * height for _ in range(width)]  # open[x][y]; everything starts out as a wall
+
+
+def _carve(open, fromPos, toPos):
+    (x1, y1), (x2, y2) = fromPos, toPos
+    for x in range(min(x1, x2), max(x1, x2) + 1):
+        for y in range(min(y1, y2), max(y1, y2) + 1):
+            open[x][y] = True
+
+
+def _connected(open, fromPos, toPos):
+    seen = set([fromPos])
+    frontier = [fromPos]
+    while frontier:
+        x, y = frontier.pop()
+        for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if open[neighbor[0]][neighbor[1]] and neighbor not in seen:
+                if neighbor == toPos:
+                    return True
+                seen.add(neighbor)
+                frontier.append(neighbor)
+    return False
+
+
+def _render(open, start):
+    # layout text, top row first (layout.Layout flips y back); the border is always wall
+    width, height = len(open), len(open[0])
+    rows = []
+    for y in range(height - 1, -1, -1):
+        row = ['%' if x in (0, width - 1) or y in (0, height - 1) or not open[x][y] else ' ' for x in range(width)]
+        if y == 1:
+            row[1] = '.'
+        if y == start[1]:
+            row[start[0]] = 'P'
+        rows.append(''.join(row))
+    return rows
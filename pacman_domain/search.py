@@ -17,10 +17,12 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import collections
 import util
 from game import Actions
 import lifelong_planning_a_star_hans as lpa
 import d_star_lite_hans as dsl
+import d_star_hans as ds
 from game import Directions
 
 
@@ -203,36 +205,43 @@ def uniformCostSearch(problem):
     # Each element in the fringe stores the state and the cost to reach it.
     fringe = util.PriorityQueue()
     fringe.push(startState, 0)
-    # Each pair in itemsInFringe stores a state and the list of actions
-    # required to reach it.  States are added in itemsInFringe when they are
-    # added to the fringe.  The states are removed from itemsInFringe when
-    # they get removed from the fringe.
-    itemsInFringe = {startState: []}
+    # costs stores the cost of the cheapest path found so far to each state,
+    # and parents the (state, action) pair that path arrives by; the actions
+    # are only put together once a goal is reached.
+    costs = {startState: 0}
+    parents = {startState: None}
     visitedStates = Set()
     while not fringe.isEmpty():
         currState = fringe.pop()
-        actionsToCurrState = itemsInFringe[currState]
-        del itemsInFringe[currState]
-        costOfActionsToCurrState = problem.getCostOfActions(actionsToCurrState)
         if problem.isGoalState(currState):
-            return actionsToCurrState
+            return actionsTo(currState, parents)
         visitedStates.add(currState)
         for successor, action, stepCost in problem.getSuccessors(currState):
-            newCostToSuccessor = costOfActionsToCurrState + stepCost
-            newActionsToSuccessor = actionsToCurrState + [action]
+            newCostToSuccessor = costs[currState] + stepCost
             if successor not in visitedStates:
                 fringe.update(successor, newCostToSuccessor)
-                if successor in itemsInFringe and \
-                        problem.getCostOfActions(itemsInFringe[successor]) <= \
-                        newCostToSuccessor:
-                    # If successor is already in itemsInFringe, only update the
+                if successor in costs and costs[successor] <= newCostToSuccessor:
+                    # If successor is already in the fringe, only update the
                     # cost if the current cost is greater than the new cost.
                     continue
-                itemsInFringe[successor] = newActionsToSuccessor
+                costs[successor] = newCostToSuccessor
+                parents[successor] = (currState, action)
     # Goal not found, so no action.
     return []
 
 
+def actionsTo(state, parents):
+    """
+    Returns the actions along the parent pointers from the start to state.
+    """
+    actions = []
+    while parents[state] is not None:
+        state, action = parents[state]
+        actions.append(action)
+    actions.reverse()
+    return actions
+
+
 def nullHeuristic(state, problem=None):
     """
     A heuristic function estimates the cost from the current state to the nearest
@@ -248,37 +257,29 @@ def aStarSearch(problem, heuristic=nullHeuristic):
     startState = problem.getStartState()
     if problem.isGoalState(startState):
         return []
-    # Each element in the fringe stores the state and the cost to reach it.
+    # Each element in the fringe stores the state and its cost plus heuristic.
     fringe = util.PriorityQueue()
     fringe.push(startState, 0 + heuristic(startState, problem))
-    # Each pair in itemsInFringe stores a state and the list of actions
-    # required to reach it.  States are added in itemsInFringe when they are
-    # added to the fringe.  The states are removed from itemsInFringe when
-    # they get removed from the fringe.
-    itemsInFringe = {startState: []}
+    # costs and parents are kept as in uniformCostSearch.
+    costs = {startState: 0}
+    parents = {startState: None}
     visitedStates = Set()
     while not fringe.isEmpty():
         currState = fringe.pop()
-        actionsToCurrState = itemsInFringe[currState]
-        del itemsInFringe[currState]
-        costOfActionsToCurrState = problem.getCostOfActions(actionsToCurrState)
         if problem.isGoalState(currState):
-            return actionsToCurrState
+            return actionsTo(currState, parents)
         visitedStates.add(currState)
         for successor, action, stepCost in problem.getSuccessors(currState):
             heuristicCostToSuccessor = heuristic(successor, problem)
-            newCostToSuccessor = costOfActionsToCurrState + stepCost + \
-                                 heuristicCostToSuccessor
-            newActionsToSuccessor = actionsToCurrState + [action]
+            newCostToSuccessor = costs[currState] + stepCost
             if successor not in visitedStates:
-                fringe.update(successor, newCostToSuccessor)
-                if successor in itemsInFringe and \
-                        problem.getCostOfActions(itemsInFringe[successor]) + \
-                        heuristicCostToSuccessor <= newCostToSuccessor:
-                    # If successor is already in itemsInFringe, only update the
+                fringe.update(successor, newCostToSuccessor + heuristicCostToSuccessor)
+                if successor in costs and costs[successor] <= newCostToSuccessor:
+                    # If successor is already in the fringe, only update the
                     # cost if the current cost is greater than the new cost.
                     continue
-                itemsInFringe[successor] = newActionsToSuccessor
+                costs[successor] = newCostToSuccessor
+                parents[successor] = (currState, action)
     # Goal not found, so no action.
     return []
 
@@ -322,13 +323,26 @@ def coordListToActionList(coord_list):
     return directions
 
 
-def naiveReplanningAStarSearch(problem, heuristic):
+REPLAN_STRATEGIES = ('scratch', 'adaptive', 'prefix')
+
+
+def naiveReplanningAStarSearch(problem, heuristic, replan='scratch'):
     """
     Applies AStarSearch in the scenario where the agent only knows the goal
     state and does not know the location of the walls.  When the agent finds out
     a location of a wall from its successor states, it will need to restart the
     AStarSearch.
 
+    replan picks how much each search costs:
+      scratch:  every search is aStarSearch, started over (the baseline)
+      adaptive: every search is replanAStarSearch, which keeps what the
+                searches before it learned about the cost to the goal, and
+                breaks ties between equal priorities toward the deeper state
+      prefix:   as adaptive, but the rest of the plan is checked against every
+                wall found, and only the part after the last cell still open
+                before a newly found wall is planned again
+    Every search counts its expansions in problem._expanded, as before.
+
     We can initally test the implementation of this algorithm with tinyMaze grid
     using this command:
     python pacman.py -l tinyMaze -p SearchAgent -a fn=nrastar,prob=ReplanningSearchProblem,heuristic=manhattanHeuristic
@@ -336,25 +350,36 @@ def naiveReplanningAStarSearch(problem, heuristic):
     Then we can verify that the algorithm works with other grids, using the
     layouts from the layouts/ directory.
     """
+    if replan not in REPLAN_STRATEGIES:
+        raise ValueError('replan must be one of %s: %s' % (REPLAN_STRATEGIES, replan))
+    if replan == 'scratch':
+        search = lambda: aStarSearch(problem, heuristic)
+    else:
+        learned = {}  # state -> lower bound on its cost to the goal, from the searches so far
+        search = lambda: replanAStarSearch(problem, heuristic, learned)
+
     startState = problem.getStartState()
     curr_x, curr_y = startState[0], startState[1]
     pathSoFar = []
-    action_list = aStarSearch(problem, heuristic)
+    action_list = collections.deque(search())
     while not problem.isGoalState((curr_x, curr_y)):
         pathSoFar.append((curr_x, curr_y))
-        next_x, next_y = getCoordinate(curr_x, curr_y, action_list.pop(0))
 
-        # see the adjacent walls
-        for adjacent_direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            adj_x, adj_y = getCoordinate(curr_x, curr_y, adjacent_direction)
-            if not problem.isNaiveWall(adj_x, adj_y) and \
-                    problem.isWall(adj_x, adj_y):
+        # see the walls in sensor range
+        found = []
+        for adj_x, adj_y in problem.senseWalls((curr_x, curr_y)):
+            if not problem.isNaiveWall(adj_x, adj_y):
                 problem.setNaiveWalls(adj_x, adj_y)
+                found.append((adj_x, adj_y))
+        if replan == 'prefix' and found:
+            action_list = repairPlan(problem, search, (curr_x, curr_y), action_list, found)
 
         # replan only if needed (i.e. we're about to bonk against a wall)
+        next_x, next_y = getCoordinate(curr_x, curr_y, action_list[0])
         if problem.isNaiveWall(next_x, next_y):
-            action_list = aStarSearch(problem, heuristic)
-            next_x, next_y = getCoordinate(curr_x, curr_y, action_list.pop(0))
+            action_list = collections.deque(search())
+            next_x, next_y = getCoordinate(curr_x, curr_y, action_list[0])
+        action_list.popleft()
 
         curr_x, curr_y = next_x, next_y
         problem.setStartState(curr_x, curr_y)
@@ -365,51 +390,123 @@ def naiveReplanningAStarSearch(problem, heuristic):
     return actions
 
 
+def adaptiveReplanningAStarSearch(problem, heuristic):
+    return naiveReplanningAStarSearch(problem, heuristic, replan='adaptive')
+
+
+def prefixReplanningAStarSearch(problem, heuristic):
+    return naiveReplanningAStarSearch(problem, heuristic, replan='prefix')
+
+
+def replanAStarSearch(problem, heuristic, learned):
+    """
+    A* for repeated searches toward the same goal while walls are only added
+    (Adaptive A*). Once a goal is reached at cost C, C minus the cost of the
+    path to any expanded state is a lower bound on that state's cost to the
+    goal, which stays one as more walls are found; learned keeps these, and
+    the heuristic used is the larger of them and heuristic, which is as
+    consistent as heuristic is. Among states of equal priority, the one
+    farthest from the start is expanded first, so that a search over open
+    space follows one path instead of filling every tied cell.
+    """
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    estimate = lambda state: max(heuristic(state, problem), learned.get(state, 0))
+    fringe = util.PriorityQueue()
+    fringe.push(startState, (estimate(startState), 0))
+    costs = {startState: 0}
+    parents = {startState: None}
+    visitedStates = set()
+    while not fringe.isEmpty():
+        currState = fringe.pop()
+        if problem.isGoalState(currState):
+            goalCost = costs[currState]
+            for state in visitedStates:
+                learned[state] = max(learned.get(state, 0), goalCost - costs[state])
+            return actionsTo(currState, parents)
+        visitedStates.add(currState)
+        for successor, action, stepCost in problem.getSuccessors(currState):
+            newCostToSuccessor = costs[currState] + stepCost
+            if successor not in visitedStates and \
+                    (successor not in costs or newCostToSuccessor < costs[successor]):
+                costs[successor] = newCostToSuccessor
+                parents[successor] = (currState, action)
+                fringe.update(successor, (newCostToSuccessor + estimate(successor), -newCostToSuccessor))
+    # Goal not found, so no action.
+    return []
+
+
+def repairPlan(problem, search, position, action_list, found):
+    """
+    Returns the plan from position with the part from the last cell before the
+    first newly found wall on it planned again by search, or the plan as it is
+    if none of the found walls is on it.
+    """
+    found = set(found)
+    x, y = position
+    cells = []
+    for action in action_list:
+        x, y = getCoordinate(x, y, action)
+        if (x, y) in found:
+            break
+        cells.append((x, y))
+    else:
+        return action_list  # still open all the way
+    if not cells:
+        return action_list  # the very next step is blocked, which is replanned from here anyway
+
+    startState = problem.getStartState()
+    problem.setStartState(cells[-1][0], cells[-1][1])
+    repair = search()
+    problem.setStartState(startState[0], startState[1])
+    if not repair:
+        return action_list  # no way on from there; left to the check before the step into the wall
+    return collections.deque(list(action_list)[:len(cells)] + repair)
+
+
+def replanningHeuristic(problem):
+    """
+    Returns the distance heuristic for the incremental planners. The planners
+    charge problem.costFn for every cell they step into, so when some steps cost
+    less than 1 (e.g. stayEastCost), the Manhattan distance is scaled down by the
+    cheapest step to keep it admissible.
+    """
+    width, height = problem.getDims()
+    cheapest = min(problem.costFn((x, y)) for x in range(width) for y in range(height))
+    if cheapest >= 1:
+        return lpa.l1_dist
+    return lambda coord1, coord2: cheapest * lpa.l1_dist(coord1, coord2)
+
+
 def LPAStarSearch(problem):
-    lpastar_obj = lpa.LPAStar(problem)
+    lpastar_obj = lpa.LPAStar(problem, replanningHeuristic(problem))
 
     startState = problem.getStartState()
     curr_tup = tuple(startState)
     pathSoFar = []
-    coord_list = lpastar_obj.extract_path()[1:]  # slice off the start position; we're already there
+    coord_list = lpastar_obj.extract_path()
+    position = lpastar_obj.path_index()  # coord -> index in the path, instead of scanning it
+    next_index = 1  # the position in coord_list to walk to next; the start position is index 0, and we're there
     while not problem.isGoalState(curr_tup):
         pathSoFar.append(curr_tup)
-        next_tup = coord_list.pop(0)
-
-        # see the adjacent walls
-        for adjacent_direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            adj_x, adj_y = getCoordinate(curr_tup[0], curr_tup[1], adjacent_direction)
-            if problem.isWall(adj_x, adj_y):
-                lpastar_obj.make_wall_at((adj_x, adj_y))
-
-        if lpastar_obj._has_path is False:
-            # something changed! we must adapt
-            new_coord_list = lpastar_obj.extract_path()
-            if next_tup not in new_coord_list:
-                # we've totally diverged, and need to backtrack
-                back_path = []
-                old_path = list(pathSoFar)
-                pathSoFar.pop()  # remove the current position, it's not part of the back path
-                trace_tup = pathSoFar.pop()
-
-                # this gets us from the current position back to the intersection point
-                while trace_tup not in new_coord_list:
-                    back_path.append(trace_tup)
-                    trace_tup = pathSoFar.pop()
-
-                # this gets us from the original start to the intersection point
-                while new_coord_list.pop(0) != trace_tup:
-                    continue
 
-                # reassemble the pieces
-                pathSoFar = old_path + back_path + [trace_tup]
-                coord_list = new_coord_list
-                next_tup = coord_list.pop(0)
-            else:
-                while next_tup != new_coord_list.pop(0):
-                    continue  # pop until they match, then continue with the updated path
-                coord_list = new_coord_list
-        curr_tup = next_tup
+        # see the walls in sensor range; walls only ever make paths longer, so the plan still holds unless one of
+        # them is on the way ahead
+        seen = problem.senseWalls(curr_tup)
+        lpastar_obj.make_walls_at(seen)
+        blocked = any(position.get(wall, -1) >= next_index for wall in seen)
+
+        if blocked:
+            # something changed! re-root the search tree here, and take the new shortest path from where we stand.
+            # this costs a fresh search from here, with more pops than even nrastar on large mazes (see the README),
+            # but the path is much shorter than walking back to where the old and new paths meet, as it was before
+            lpastar_obj.move_start(curr_tup)
+            coord_list = lpastar_obj.extract_path()
+            position = lpastar_obj.path_index()
+            next_index = 1
+        curr_tup = coord_list[next_index]
+        next_index += 1
 
     pathSoFar.append(curr_tup)
     actions = coordListToActionList(pathSoFar)
@@ -421,13 +518,9 @@ def LPAStarSearch(problem):
 def DStarLiteSearch(problem):
     startState = problem.getStartState()
     x, y = startState[0], startState[1]
-    dstarlite_obj = dsl.DStarLite(problem)
+    dstarlite_obj = dsl.DStarLite(problem, replanningHeuristic(problem))
     while (x, y) != problem.getGoalState():
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if problem.isWall(nextx, nexty):
-                dstarlite_obj.make_wall_at((nextx, nexty))
+        dstarlite_obj.make_walls_at(problem.senseWalls((x, y)))  # one repair pass for everything seen from here
         x, y = dstarlite_obj.take_step()
     path = dstarlite_obj.get_route()
     directions = coordListToActionList(path)
@@ -435,11 +528,34 @@ def DStarLiteSearch(problem):
     return directions
 
 
+def DStarSearch(problem):
+    """
+    The original D* (with the focussing heuristic of Focussed D*), walked like
+    DStarLiteSearch: the robot follows the back pointers toward the goal, and
+    every batch of walls it sees is repaired with RAISE and LOWER waves.
+
+    python pacman.py -l openMaze -p SearchAgent -a fn=dstar,prob=ReplanningSearchProblem,heuristic=manhattanHeuristic
+    """
+    startState = problem.getStartState()
+    x, y = startState[0], startState[1]
+    dstar_obj = ds.DStar(problem, replanningHeuristic(problem))
+    while (x, y) != problem.getGoalState():
+        dstar_obj.make_walls_at(problem.senseWalls((x, y)))
+        x, y = dstar_obj.take_step()
+    path = dstar_obj.get_route()
+    directions = coordListToActionList(path)
+    problem._expanded = dstar_obj._pop_count
+    return directions
+
+
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
 nrastar = naiveReplanningAStarSearch
+nrastar_adaptive = adaptiveReplanningAStarSearch
+nrastar_prefix = prefixReplanningAStarSearch
 lpastar = LPAStarSearch
 dstarlite = DStarLiteSearch
+dstar = DStarSearch
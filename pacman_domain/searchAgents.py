@@ -37,10 +37,13 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
 import util
 import time
 import search
-import copy
+import d_star_lite_hans as dsl
+import distanceCache
+import landmarks_hans
 
 
 class GoWestAgent(Agent):
@@ -76,7 +79,8 @@ class SearchAgent(Agent):
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='ReplanningSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='ReplanningSearchProblem', heuristic='nullHeuristic',
+                 sensorRadius=None, sensor=None, costFn=None):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
@@ -103,6 +107,25 @@ class SearchAgent(Agent):
         self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
 
+        # Optional wall-sensor settings, passed through to the (replanning) search problem
+        problemArgs = {}
+        if sensorRadius is not None:
+            problemArgs['sensorRadius'] = int(sensorRadius)
+        if sensor is not None:
+            problemArgs['sensor'] = sensor
+        if problemArgs:
+            print('[SearchAgent] using sensor settings %s' % problemArgs)
+
+        # Optional cost function (e.g. stayEastCost), for weighted problems
+        if costFn is not None:
+            if costFn not in globals().keys() or not costFn.endswith('Cost'):
+                raise AttributeError, costFn + ' is not a cost function in searchAgents.py.'
+            problemArgs['costFn'] = globals()[costFn]
+            print('[SearchAgent] using cost function ' + costFn)
+        if problemArgs:
+            searchType = self.searchType
+            self.searchType = lambda state: searchType(state, **problemArgs)
+
     def registerInitialState(self, state):
         """
         This is the first time that the agent sees the layout of the game
@@ -247,32 +270,33 @@ class PositionSearchProblem(search.SearchProblem):
 
 class ReplanningSearchProblem(search.SearchProblem):
     """
+    A PositionSearchProblem in which the agent starts out knowing only the
+    outer walls, and discovers the others with a sensor as it moves.
     """
 
-    def __init__(self, gameState, costFn=lambda x: 1, goal=(1, 1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn=lambda x: 1, goal=(1, 1), start=None, warn=True, visualize=True,
+                 sensorRadius=1, sensor='manhattan'):
         """
         Stores the start and goal.
 
         gameState: A GameState object (pacman.py)
         costFn: A function from a search state (tuple) to a non-negative number
         goal: A position in the gameState
+        sensorRadius: How far (in Manhattan distance) the agent can see walls
+        sensor: 'manhattan' sees every wall within the radius, 'los' only
+                those with a clear line of sight, and 'fov' every wall in
+                line of sight however far (the radius is not used)
         """
         self.actualWalls = gameState.getWalls()
-        self.naiveWalls = copy.deepcopy(self.actualWalls)
         self.height = self.actualWalls.height
         self.width = self.actualWalls.width
 
-        for coord in self.naiveWalls.asList():
-            if coord[1] == 0 or coord[1] == self.width:
-                continue
-            if coord[0] == 0 or coord[0] == self.height:
-                continue
-            self.naiveWalls[coord[0]][coord[1]] = False  # we don't know about any walls at the start
-
-        top, right = self.height - 2, self.width - 2
+        # we don't know about any walls at the start but the outer ones: copy just the border of the actual walls
+        self.naiveWalls = Grid(self.width, self.height)
+        for x in (0, self.width - 1):
+            self.naiveWalls[x] = self.actualWalls[x][:]
         for x in range(1, self.width - 1):
-            for y in range(1, self.height - 1):
-                self.naiveWalls[x][y] = False
+            self.naiveWalls[x][0], self.naiveWalls[x][-1] = self.actualWalls[x][0], self.actualWalls[x][-1]
         print (self.width, self.height)
         self.startState = gameState.getPacmanPosition()
         if start is not None:
@@ -283,9 +307,38 @@ class ReplanningSearchProblem(search.SearchProblem):
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print 'Warning: this does not look like a regular search maze'
 
+        # Sensor offsets, nearest first; radius 1 gives the adjacent cells in N, S, E, W order
+        if sensor not in ('manhattan', 'los', 'fov'):
+            raise AttributeError, sensor + ' is not a sensor model (use manhattan, los or fov).'
+        self.sensor = sensor
+        self.visibility = gameState.data.layout.visibility  # cached per layout, for 'los' and 'fov'
+        self.sensorOffsets = sorted([(dx, dy) for dx in range(-sensorRadius, sensorRadius + 1)
+                                     for dy in range(-sensorRadius, sensorRadius + 1)
+                                     if 0 < abs(dx) + abs(dy) <= sensorRadius],
+                                    key=lambda (dx, dy): (abs(dx) + abs(dy), abs(dx), -dy, -dx))
+
         # For display purposes
         self._visited, self._visitedlist, self._expanded = {}, [], 0  # DO NOT CHANGE
 
+    def senseWalls(self, position):
+        """
+        Returns the actual walls the sensor can see from position.
+        """
+        if self.sensor == 'fov':
+            return self.visibility.wallsInView(position)
+        x, y = position
+        seen = []
+        for dx, dy in self.sensorOffsets:
+            wallx, wally = x + dx, y + dy
+            if not (0 <= wallx < self.width and 0 <= wally < self.height):
+                continue
+            if not self.actualWalls[wallx][wally]:
+                continue
+            if self.sensor == 'los' and not self.visibility.isVisible(position, (wallx, wally)):
+                continue
+            seen.append((wallx, wally))
+        return seen
+
     def getNaiveWalls(self):
         return self.naiveWalls
 
@@ -370,6 +423,16 @@ class ReplanningSearchProblem(search.SearchProblem):
         return cost
 
 
+def stayEastCost(pos):
+    "The cost of stepping into pos for StayEastSearchAgent: 1/2^x"
+    return .5 ** pos[0]
+
+
+def stayWestCost(pos):
+    "The cost of stepping into pos for StayWestSearchAgent: 2^x"
+    return 2 ** pos[0]
+
+
 class StayEastSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -380,7 +443,7 @@ class StayEastSearchAgent(SearchAgent):
 
     def __init__(self):
         self.searchFunction = search.uniformCostSearch
-        costFn = lambda pos: .5 ** pos[0]
+        costFn = stayEastCost
         self.searchType = lambda state: PositionSearchProblem(state, costFn, (1, 1), None, False)
 
 
@@ -394,7 +457,7 @@ class StayWestSearchAgent(SearchAgent):
 
     def __init__(self):
         self.searchFunction = search.uniformCostSearch
-        costFn = lambda pos: 2 ** pos[0]
+        costFn = stayWestCost
         self.searchType = lambda state: PositionSearchProblem(state, costFn)
 
 
@@ -412,6 +475,22 @@ def euclideanHeuristic(position, problem, info={}):
     return ((xy1[0] - xy2[0]) ** 2 + (xy1[1] - xy2[1]) ** 2) ** 0.5
 
 
+_landmarks = (None, None)  # the walls last asked for and their landmark heuristic
+
+
+def landmarkHeuristic(position, problem, info={}):
+    """
+    The landmark (ALT) heuristic for a PositionSearchProblem: never less than
+    the Manhattan distance, but it knows about the walls of the layout. The
+    landmark tables are built once per layout.
+    """
+    global _landmarks
+    walls = problem.walls
+    if _landmarks[0] is not walls:
+        _landmarks = (walls, landmarks_hans.LandmarkHeuristic((walls.width, walls.height), walls))
+    return _landmarks[1](position, problem.goal)
+
+
 #####################################################
 # This portion is incomplete.  Time to write code!  #
 #####################################################
@@ -579,6 +658,7 @@ def cornersHeuristic(state, problem):
     walls = problem.walls  # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
+    distance = distanceCache.getCache(walls).distance  # maze distances, searched from the (few) targets only
     gotBotLeftCorner = state[1]
     gotTopLeftCorner = state[2]
     gotBotRightCorner = state[3]
@@ -609,31 +689,27 @@ def cornersHeuristic(state, problem):
         y = position[1]
         for possMove in possMoveTuple:
             if possMove == 'goBotLeft':
-                toBotLeftCornerCost = abs(x - problem.botLeftCorner[0]) + \
-                                      abs(y - problem.botLeftCorner[1])
+                toBotLeftCornerCost = distance(problem.botLeftCorner, (x, y))
                 possMoveCost += toBotLeftCornerCost
                 x = problem.botLeftCorner[0]
                 y = problem.botLeftCorner[1]
             elif possMove == 'goTopLeft':
-                toTopLeftCornerCost = abs(x - problem.topLeftCorner[0]) + \
-                                      abs(y - problem.topLeftCorner[1])
+                toTopLeftCornerCost = distance(problem.topLeftCorner, (x, y))
                 possMoveCost += toTopLeftCornerCost
                 x = problem.topLeftCorner[0]
                 y = problem.topLeftCorner[1]
             elif possMove == 'goBotRight':
-                toBotRightCornerCost = abs(x - problem.botRightCorner[0]) + \
-                                       abs(y - problem.botRightCorner[1])
+                toBotRightCornerCost = distance(problem.botRightCorner, (x, y))
                 possMoveCost += toBotRightCornerCost
                 x = problem.botRightCorner[0]
                 y = problem.botRightCorner[1]
             elif possMove == 'goTopRight':
-                toTopRightCornerCost = abs(x - problem.topRightCorner[0]) + \
-                                       abs(y - problem.topRightCorner[1])
+                toTopRightCornerCost = distance(problem.topRightCorner, (x, y))
                 possMoveCost += toTopRightCornerCost
                 x = problem.topRightCorner[0]
                 y = problem.topRightCorner[1]
             elif possMove == 'goCenter':
-                toCenterCost = abs(x - problem.center[0]) + abs(y - problem.center[1])
+                toCenterCost = distance(problem.center, (x, y))
                 possMoveCost += toCenterCost
                 x = problem.center[0]
                 y = problem.center[1]
@@ -746,6 +822,7 @@ def foodHeuristic(state, problem):
     x = position[0]
     y = position[1]
     # return foodGrid.count()  # at most 15000 nodes solution (2/4)
+    distance = distanceCache.getCache(problem.walls).distance  # maze distances, searched from the dots
     if 'foodLocs' not in problem.heuristicInfo:
         foodLocs = []
         for xfood in range(1, foodGrid.width):
@@ -768,7 +845,7 @@ def foodHeuristic(state, problem):
         for foodLoc in allFoodLocs:
             foodLocX = foodLoc[0]
             foodLocY = foodLoc[1]
-            currDist = abs(foodLocX - currX) + abs(foodLocY - currY)
+            currDist = distance(foodLoc, (currX, currY))
             if currDist < currMinDist:
                 currMinDist = currDist
                 minX = foodLocX
@@ -786,7 +863,7 @@ def foodHeuristic(state, problem):
         for foodLoc in allFoodLocs:
             foodLocX = foodLoc[0]
             foodLocY = foodLoc[1]
-            currDist = abs(foodLocX - currX) + abs(foodLocY - currY)
+            currDist = distance(foodLoc, (currX, currY))
             if currDist > currMaxDist:
                 currMaxDist = currDist
                 maxX = foodLocX
@@ -812,8 +889,12 @@ def foodHeuristic(state, problem):
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
 
+    foodPlanner = None  # the search toward the remaining dots; see findPathToClosestDot
+    foodWalls = None  # the walls it was made for
+
     def registerInitialState(self, state):
         self.actions = []
+        self.foodPlanner = None
         currentState = state
         while (currentState.getFood().count() > 0):
             nextPathSegment = self.findPathToClosestDot(currentState)  # The missing piece
@@ -836,64 +917,25 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-
-        def getDistNearestFood(currX, currY):
-            if food[currX][currY]:
-                return 0
-            distances = []
-            for distance in range(max(food.width, food.height)):
-                for dx in range(distance + 1):
-                    for dy in range(distance + 1):
-                        if dx + dy == distance:
-                            for (iterDx, iterDy) in [(dx, dy), (-dx, -dy), (-dx, dy), (dx, -dy)]:
-                                possFoodX = currX + iterDx
-                                possFoodY = currY + iterDy
-                                if possFoodX < 0 or possFoodX >= food.width:
-                                    continue
-                                if possFoodY < 0 or possFoodY >= food.height:
-                                    continue
-                                if food[possFoodX][possFoodY]:
-                                    distances.append(distance)
-            if not distances:
-                return 999999
-            return min(distances)
-
-        from sets import Set
-        startState = startPosition
-        if problem.isGoalState(startState):
-            return []
-        # Each element in the fringe stores the state and the cost to reach it.
-        fringe = util.PriorityQueue()
-        fringe.push(startState, getDistNearestFood(startState[0], startState[1]))
-        # Each pair in itemsInFringe stores a state and the list of actions
-        # required to reach it.  States are added in itemsInFringe when they are
-        # added to the fringe.  The states are removed from itemsInFringe when
-        # they get removed from the fringe.
-        itemsInFringe = {startState: []}
-        visitedStates = Set()
-        while not fringe.isEmpty():
-            currState = fringe.pop()
-            actionsToCurrState = itemsInFringe[currState]
-            del itemsInFringe[currState]
-            costOfActionsToCurrState = getDistNearestFood(currState[0], currState[1])
-            if problem.isGoalState(currState):
-                return actionsToCurrState
-            visitedStates.add(currState)
-            for successor, action, stepCost in problem.getSuccessors(currState):
-                successorX = successor[0]
-                successorY = successor[1]
-                if walls[successorX][successorY]:
-                    continue
-                newCostToSuccessor = costOfActionsToCurrState + getDistNearestFood(successorX, successorY)
-                newActionsToSuccessor = actionsToCurrState + [action]
-                if successor not in visitedStates:
-                    fringe.update(successor, newCostToSuccessor)
-                    itemsInFringe[successor] = newActionsToSuccessor
-        # Goal not found, so no action.
-        return []
+        if food.count() == 0:
+            return []  # no dot left, so no action
+
+        # one D* Lite search toward every dot at once serves all the segments: the dots are its goals, and as they
+        # get eaten they are removed from it (and pacman moved) rather than searching again from scratch
+        if self.foodPlanner is None or self.foodWalls is not walls:
+            self.foodPlanner = dsl.DStarLite(AnyFoodSearchProblem(gameState))
+            self.foodWalls = walls
+        else:
+            for goal in self.foodPlanner.get_goals():
+                if not food[goal[0]][goal[1]]:
+                    self.foodPlanner.remove_goal(goal)
+            self.foodPlanner.move_start(startPosition)
+        path = self.foodPlanner.extract_path()
+        if path is None:
+            return []  # no dot can be reached, so no action
+        return search.coordListToActionList(path)
 
 
 class AnyFoodSearchProblem(PositionSearchProblem):
@@ -934,6 +976,12 @@ class AnyFoodSearchProblem(PositionSearchProblem):
             return True
         return False
 
+    def getNaiveWalls(self):
+        return self.walls  # nothing to discover; the planners take the walls as known from the start
+
+    def getGoalState(self):
+        return self.food.asList()  # any of the dots
+
 
 def mazeDistance(point1, point2, gameState):
     """
@@ -950,5 +998,5 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    distance = distanceCache.getCache(walls).distance(point1, point2)  # one BFS per source, and per layout
+    return 0 if distance == float('inf') else distance  # as the search it replaces did, when there is no path
@@ -174,37 +174,52 @@ class PriorityQueue:
       has a priority associated with it and the client is usually interested
       in quick retrieval of the lowest-priority item in the queue. This
       data structure allows O(1) access to the lowest-priority item.
+
+      Items are also indexed, so that update finds an item in O(1) instead of
+      scanning the heap; an entry it supersedes is marked removed and skipped
+      when it reaches the top (lazy deletion).
     """
+    REMOVED = object()  # stands in for the item of a superseded entry
+
     def  __init__(self):
         self.heap = []
         self.count = 0
+        self.entries = {}  # item -> its live [priority, count, item] entry
 
     def push(self, item, priority):
-        entry = (priority, self.count, item)
+        entry = [priority, self.count, item]
         heapq.heappush(self.heap, entry)
+        self.entries[item] = entry
         self.count += 1
 
     def pop(self):
-        (_, _, item) = heapq.heappop(self.heap)
+        self.discardRemoved()
+        (_, _, item) = entry = heapq.heappop(self.heap)
+        if self.entries.get(item) is entry:
+            del self.entries[item]
         return item
 
     def isEmpty(self):
+        self.discardRemoved()
         return len(self.heap) == 0
 
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
         # If item not in priority queue, do the same thing as self.push.
-        for index, (p, c, i) in enumerate(self.heap):
-            if i == item:
-                if p <= priority:
-                    break
-                del self.heap[index]
-                self.heap.append((priority, c, item))
-                heapq.heapify(self.heap)
-                break
-        else:
+        entry = self.entries.get(item)
+        if entry is None:
             self.push(item, priority)
+        elif priority < entry[0]:
+            # the new entry keeps the old one's count, so that ties still pop in the order the items were first pushed
+            entry[2] = self.REMOVED
+            entry = [priority, entry[1], item]
+            heapq.heappush(self.heap, entry)
+            self.entries[item] = entry
+
+    def discardRemoved(self):
+        while self.heap and self.heap[0][2] is self.REMOVED:
+            heapq.heappop(self.heap)
 
 class PriorityQueueWithFunction(PriorityQueue):
     """
@@ -4,17 +4,28 @@
 # Rishabh Hatgadkar
 # Nicholas Martinez
 #
-# This implementation of D* Lite based on the following paper:
-# "Improved fast replanning for robot navigation in unknown terrain"
-# https://doi.org/10.1109/ROBOT.2002.1013481
+# This implementation of D* (with the focussing heuristic of Focussed D*) based on the following papers:
+# "Optimal and efficient path planning for partially-known environments"
+# https://doi.org/10.1109/ROBOT.1994.351061
+# "The Focussed D* Algorithm for Real-Time Replanning" (IJCAI 1995)
 #
+
+# imports
 import enum
+from array import array
+
+from src import lifelong_planning_a_star as lpa
+
+# global variables
+INF = float("inf")
+NO_BACK = -1  # the back pointer of a goal, or of a cell that was never reached
 
 
 class Point:
-    # this is a helper class that provides functionality used in the graph traversal
+    # this is a helper class that provides functionality used in the graph traversal; the planner itself keeps one
+    # record per cell in flat arrays, and only hands these out as snapshots (see DStar.get_point)
 
-    class PointState(enum):
+    class PointState(enum.Enum):
         # note that this uses the past-tense to get around the 'raise' keyword reservation
         new = 1
         opened = 2
@@ -22,6 +33,8 @@ class Point:
         raised = 4
         lowered = 5
 
+    __slots__ = ("cost", "neighbors", "state")
+
     def __init__(self, init_cost=0, init_neighbors=None, init_state=PointState.new):
         # let the accessors handle error checking
         self.cost = None
@@ -59,15 +72,365 @@ class Point:
             raise ValueError("Point set to illegal state: {0}".format(new_state))
 
     def is_state(self, state):
-        return str(state) == self.get_state()
+        return self.state == state
+
+
+# the tags t(X) of the paper, as stored per cell
+NEW = Point.PointState.new.value
+OPEN = Point.PointState.opened.value
+CLOSED = Point.PointState.closed.value
+
+
+# assumptions:
+# all edge weights are either 1 (adjacent) or infinity (non-adjacent or walls), unless a cost map is given; then the
+# weight of an edge is the (positive) cost of the cell it steps into, and the heuristic must not overestimate it
+# 2-dimensional, rectilinear map; all squares which are adjacent are connected by default
+# with 8-connectivity, diagonal steps are sqrt(2) times as long, and may not cut past the corner of a wall
+
+
+# noinspection PyAttributeOutsideInit
+class DStar(lpa.LPAStar):
+    # like D* Lite, D* searches backward from the goals: h(X) is the cost of the path from X to the nearest goal, which
+    # the back pointers b(X) lead along, and the robot walks it from the start. h lives in the g buffer of the
+    # VertexStore (it is what D* Lite calls g); the key k(X), the tag t(X), b(X) and r(X), which focussing X's queue
+    # priority was computed at, are flat arrays indexed by cell id. a cell whose cost went up is RAISE while k(X) < h(X),
+    # and LOWER when k(X) == h(X); the queue is ordered by (f_B(X), k(X)), where f_B(X) is k(X) plus the heuristic from
+    # the robot to X, plus the bias d_curr that the robot's moves have added up to since the search began
+
+    _connectivities = lpa.WALKED_CONNECTIVITIES  # take_step follows a back pointer to a neighbor, as in D* Lite
+
+    # ########  D* core functions  ########
+    def _begin(self, start_coord, goal_coord):
+        # the state of one search over the map; set up by initialize, and again by reset
+        self._start = start_coord
+        self._goals = lpa.goal_list(goal_coord)  # in the order given
+        self._goal = self._goals[0]
+        self._path = []
+        self._pop_count = 0
+
+        self._has_path = False
+        self._best_path = None
+        self._last_path = None
+        self._raw_path = None
+        self._raw_index = {}
+
+        # internally, vertices are linear cell ids; coordinates are only used at the API boundary
+        self._start_cell = self._costs.cell_id(start_coord)
+        self._goal_cell = self._costs.cell_id(self._goal)
+        self._goal_cells = set(self._costs.cell_id(goal) for goal in self._goals)
+        self._focus_cell = self._start_cell  # R_curr: where the robot was when the queue was last focussed
+        self._focus_count = 1  # counts the focussings; a robot cell can come round again, with a different bias
+        self._bias = 0  # d_curr: the heuristic length of the robot's moves between focussings, added up
+        self._forget_heuristic()  # from the last _focus_cell, if reset
+        self._U = self._make_queue()  # the queue type depends on the heuristic and map size
+
+        # init the goal nodes (works backward); with several, h(s) is the distance to the nearest of them
+        for goal in self._goals:
+            self._insert(self._costs.cell_id(goal), 0)
+
+        # find the path at least once, so we can take a step if needed
+        self.compute_shortest_path()
+
+    def _allocate(self):
+        # the heuristic cache (from _focus_cell here, memoized by _focus), and t(X), k(X), b(X) and r(X); made once per
+        # map, and refilled in place by reset
+        super(DStar, self)._allocate()
+        self._tag = bytearray([NEW]) * self._node_count
+        self._k = array("d", [INF]) * self._node_count
+        self._back = array("i", [NO_BACK]) * self._node_count
+        self._focussed = array("i", [0]) * self._node_count
+
+    def reset(self, start_coord, goal_coord):
+        # as the other planners do; every cell is NEW again, with no key, back pointer or focussing
+        count = self._node_count  # the blanks only live for the call, as in VertexStore.reset
+        self._tag[:] = bytearray([NEW]) * count
+        self._k[:] = array("d", [INF]) * count
+        self._back[:] = array("i", [NO_BACK]) * count
+        self._focussed[:] = array("i", [0]) * count
+        super(DStar, self).reset(start_coord, goal_coord)
+
+    def _cell_keys(self, cell):
+        k = self._k[cell]
+        return self._keys(k + self._focus(cell) + self._bias, k)  # (f_B, k)
+
+    def _keys(self, f, k):
+        # keys on fractional maps are rounded, as the other planners' are (see lpa.round_keys), so that the queue's
+        # order and the comparisons below agree on ties
+        if self._diagonal or self._costs.weights is not None:
+            return lpa.round_keys(f, k)
+        return f, k
+
+    def _focus(self, cell):
+        # the focussing heuristic g(X, R_curr), from the robot to the cell
+        h_cost = self._h_cache[cell]
+        if h_cost is None:
+            h_cost = self._heuristic(self._costs.coord(self._focus_cell), self._costs.coord(cell))
+            self._h_cache[cell] = h_cost
+            self._h_cached.append(cell)
+        return h_cost
+
+    def _refocus(self):
+        # once the robot has moved, keys are focussed on where it is now. those queued before are only re-focussed as
+        # they come to the top (see _min_state): the heuristic changes by at most the length of the move, which is
+        # added to the bias, so their old priorities stay lower bounds of their new ones
+        if self._start_cell == self._focus_cell:
+            return
+        self._bias += self._heuristic(self._costs.coord(self._focus_cell), self._start)
+        self._focus_cell = self._start_cell
+        self._focus_count += 1
+        self._forget_heuristic()  # measured from the robot
+
+    def _insert(self, cell, h_new):
+        # INSERT of the paper: queues the cell with h(X) = h_new, keyed by the lowest h it has had since it was last
+        # closed. a cell that is walled in (k infinite) has nothing to pass on, so it is not queued
+        tag = self._tag[cell]
+        h = self._costs.g
+        if tag == NEW:
+            k = h_new
+        elif tag == OPEN:
+            k = min(self._k[cell], h_new)
+        else:
+            k = min(h[cell], h_new)
+        h[cell] = h_new
+        if k == INF:
+            return
+        self._k[cell] = k
+        self._tag[cell] = OPEN
+        self._focussed[cell] = self._focus_count
+        prim, sec = self._cell_keys(cell)
+        self._U.push(key=cell, primary=prim, secondary=sec)
+
+    def _min_state(self):
+        # MIN-STATE of the paper: the open cell with the lowest key, after re-focussing any that come to the top with
+        # a key focussed before the robot last moved; None if the queue is empty
+        while self._U.size() > 0:
+            cell = self._U.peek()[0]
+            if self._focussed[cell] == self._focus_count:
+                return cell
+            self._focussed[cell] = self._focus_count
+            prim, sec = self._cell_keys(cell)
+            self._U.push(key=cell, primary=prim, secondary=sec)
+        return None
+
+    def _min_val(self):
+        # MIN-VAL of the paper: (f, k) of the open cell with the lowest key, unbiased, or None if the queue is empty
+        cell = self._min_state()
+        if cell is None:
+            return None
+        k = self._k[cell]
+        return self._keys(k + self._focus(cell), k)
+
+    def _cost(self, cell):
+        # COST of the paper: (f, k) as the cell would be keyed if it were queued as LOWER now
+        h = self._costs.g[cell]
+        return self._keys(h + self._focus(cell), h)
+
+    def _arcs(self, cell):
+        # (neighbor, c(cell -> neighbor), c(neighbor -> cell)) triples, in neighbor visiting order; stepping into or out
+        # of a wall is infinitely expensive
+        weight = self._costs.get_weight_cell
+        if self._costs.is_wall_cell(cell):
+            return [(each, INF, INF) for each, _ in self._edges(cell)]
+        return [(each, length * weight(each), length * weight(cell)) for each, length in self._edges(cell)]
+
+    def process_state(self):
+        # PROCESS-STATE of the paper: expands the open cell with the lowest key, and returns the key (f, k) of the
+        # next one, or None once the queue is empty
+        x = self._min_state()
+        if x is None:
+            return None
+        h, tag, back = self._costs.g, self._tag, self._back
+        k_x = self._k[x]
+        val = self._keys(k_x + self._focus(x), k_x)
+        self._U.delete_key(x)
+        tag[x] = CLOSED
+        self._pop_count += 1
+        keys_lt = self._keys_lt()
+        arcs = self._arcs(x)
+
+        if k_x < h[x]:
+            # RAISE: the cost went up; first try to lower it again through a neighbor whose cost is known to be optimal
+            for y, out_cost, _ in arcs:
+                if tag[y] != NEW and not keys_lt(val, self._cost(y)) and h[x] > h[y] + out_cost:
+                    back[x] = y
+                    h[x] = h[y] + out_cost
+
+        if k_x == h[x]:
+            # LOWER (or a RAISE that was lowered back): pass the cost on to every neighbor that goes through this cell,
+            # or would be better off doing so
+            for y, _, in_cost in arcs:
+                through = h[x] + in_cost
+                if tag[y] == NEW or (back[y] == x and h[y] != through) or (back[y] != x and h[y] > through):
+                    back[y] = x
+                    self._insert(y, through)
+        else:
+            # RAISE: pass the higher cost on to the neighbors that go through this cell; where a neighbor could lower
+            # it, or it could lower a neighbor, the cell with the optimal cost is queued again to do so
+            for y, out_cost, in_cost in arcs:
+                through = h[x] + in_cost
+                if tag[y] == NEW or (back[y] == x and h[y] != through):
+                    back[y] = x
+                    self._insert(y, through)
+                elif back[y] != x and h[y] > through:
+                    self._insert(x, h[x])
+                elif back[y] != x and h[x] > h[y] + out_cost and tag[y] == CLOSED and keys_lt(val, self._cost(y)):
+                    self._insert(y, h[y])
+
+        return self._min_val()
+
+    def compute_shortest_path(self):
+        # processes cells until the robot's cost is known to be optimal (no queued key is lower than the robot's own
+        # would be), or the queue runs dry, in which case there is no path unless the robot was reached
+        self._refocus()
+        keys_lt = self._keys_lt()
+        start, tag = self._start_cell, self._tag
+        val = self._min_val()
+        while val is not None and (tag[start] == NEW or keys_lt(val, self._cost(start))):
+            val = self.process_state()
+        self._has_path = True
+
+    # ########  external (pacman) helper functions  ########
+    def make_wall_at(self, coord):
+        self.make_walls_at([coord])
+
+    def make_walls_at(self, coords):
+        self.apply_edge_changes([(coord, True) for coord in coords])
+
+    def apply_edge_changes(self, changes):
+        # changes is an iterable of (coord, is_wall) pairs; they are applied as one batch, like DStarLite's. every arc
+        # into or out of a changed cell changed, as did the diagonal arcs past its corners, so as in MODIFY-COST of the
+        # paper, the cell and its neighbors are queued again
+        # note that cells which were already walls when the map was initialized cannot be opened up again
+        changes = list(changes)
+        for coord, _ in changes:
+            if not self._in_map(coord):
+                raise ValueError("A wall cannot be discovered outside of the map: {0}".format(coord))
+
+        changed = []
+        seen = set()
+        for coord, is_wall in changes:
+            cell = self._costs.cell_id(coord)
+            if self._costs.is_wall_cell(cell) == is_wall:
+                continue  # already known; no edge cost changed
+            self._costs.set_wall_cell(cell, is_wall)
+            for each in [cell] + list(self._neighbors.of(cell)):
+                if each not in seen:
+                    seen.add(each)
+                    changed.append(each)
+        if not changed:
+            return  # nothing changed, so the current plan is still valid
+        self._repair(changed)
+
+    def _repair(self, cells):
+        # path might have changed!
+        self._last_path = self._best_path
+        self._best_path = None
+
+        self._refocus()  # the cells are queued focussed on where the robot is now
+        h = self._costs.g
+        for each in cells:
+            if self._tag[each] == CLOSED:
+                self._insert(each, h[each])
+        self.compute_shortest_path()  # find the new shortest path
+
+    def update_cost(self, coord, new_cost):
+        self.update_costs([(coord, new_cost)])
+
+    def update_costs(self, changes):
+        # changes is an iterable of (coord, new_cost) pairs, where a cost is that of stepping into the cell; they are
+        # applied as one batch. only the arcs into the cell changed, and those all end at the cell, so it is the only
+        # one queued again: as LOWER, it passes its cost on to the neighbors, which rise or fall with their arcs
+        changed = []
+        for coord, new_cost in changes:
+            cell = self._set_cell_weight(coord, new_cost)
+            if cell is not None:
+                changed.append(cell)
+        if not changed:
+            return  # nothing changed, so the current plan is still valid
+        self._repair(changed)
+
+    def move_start(self, coord):
+        # e.g. after the agent was moved by something else than take_step. searching backward, the start is only where
+        # the path is read off from, so no cost changes; the search goes on until the new start's cost is optimal
+        if not self._in_map(coord):
+            raise ValueError("The start cannot be moved outside of the map: {0}".format(coord))
+        cell = self._costs.cell_id(coord)
+        if cell == self._start_cell:
+            return
+        self._path.append(self._start)
+        self._start, self._start_cell = coord, cell
+        self._best_path = None  # the cached path starts from where we were
+        self.compute_shortest_path()
+
+    def _goals_changed(self, cell):
+        # searching backward, the goals are where the search grows from: a new goal is queued at cost 0, and a removed
+        # one at an infinite cost, which it will RAISE to its neighbors until it gets a cost from them instead
+        self._refocus()
+        if cell in self._goal_cells:
+            self._back[cell] = NO_BACK
+            self._insert(cell, 0)
+        else:
+            self._insert(cell, INF)
+        self._repair([])
+
+    def take_step(self):
+        if self._start_cell in self._goal_cells:
+            return self._start  # we're already at a goal; no need to move
+
+        if self._tag[self._start_cell] == NEW or self._costs.g[self._start_cell] == INF:
+            return self._start  # no path exists; no need to move
+
+        # move along the back pointer
+        self._path.append(self._start)
+        self._start_cell = self._back[self._start_cell]
+        self._start = self._costs.coord(self._start_cell)
+        self._best_path = None  # the cached path starts from where we were
+
+        return self._start
+
+    def extract_path(self, placeholder=None):
+        if self._start_cell in self._goal_cells:
+            return [self._start]  # trivial case
+
+        if self._best_path is None:
+            # follows the back pointers from the start to the goal they lead to
+            start = self._start_cell
+            if self._tag[start] == NEW or self._costs.g[start] == INF:
+                return None  # no path between start and goal
+
+            coord, back = self._costs.coord, self._back
+            cell = start
+            raw_path = [coord(cell)]
+            while cell not in self._goal_cells:
+                if len(raw_path) > self._node_count:
+                    raise RuntimeError("The back pointers do not reach a goal; the h values are inconsistent")
+                cell = back[cell]
+                raw_path.append(coord(cell))
+            self._raw_path = raw_path
+            self._raw_index = dict((each, position) for position, each in enumerate(raw_path))
+            self._best_path = raw_path
+        return self._best_path
 
+    def get_route(self):
+        res = list(self._path)
+        res.append(self._start)
+        return res
 
-class DStar:
-    def search(self):
-        pass
+    def get_state(self, coord):
+        # where the cell stands in the search; open cells are told apart as RAISE or LOWER
+        cell = self._costs.cell_id(coord)
+        tag = self._tag[cell]
+        if tag == NEW:
+            return Point.PointState.new
+        if tag == CLOSED:
+            return Point.PointState.closed
+        return Point.PointState.raised if self._k[cell] < self._costs.g[cell] else Point.PointState.lowered
 
-    def expand(self, current_point):
-        pass
+    def is_raised(self, coord):
+        return self.get_state(coord) == Point.PointState.raised
 
-    def is_raised(self):
-        pass
+    def get_point(self, coord):
+        # a snapshot of the cell's record: its cost to the nearest goal, its neighbors and its state
+        cell = self._costs.cell_id(coord)
+        neighbors = [self._costs.coord(each) for each in self._neighbors.of(cell)]
+        return Point(self._costs.g[cell], neighbors, self.get_state(coord))
@@ -11,28 +11,56 @@
 # imports
 from src import dual_priority_queue as dpq
 from src import lifelong_planning_a_star as lpa
+from src import vertex_store as vs
 
 # global variables
 EDGE_WEIGHT = 1
-Unchanged = None  # alias to improve semantic readability
 
 
 # assumptions:
-# all edge weights are either 1 (adjacent) or infinity (non-adjacent or walls)
+# all edge weights are either 1 (adjacent) or infinity (non-adjacent or walls), unless a cost map is given; then the
+# weight of an edge is the (positive) cost of the cell it steps into, and the heuristic must not overestimate it
 # 2-dimensional, rectilinear map; all squares which are adjacent are connected by default
+# with 8-connectivity, diagonal steps are sqrt(2) times as long, and may not cut past the corner of a wall
 
 
 # noinspection PyAttributeOutsideInit
 class DStarLite(lpa.LPAStar):
+    _connectivities = lpa.WALKED_CONNECTIVITIES  # take_step moves to a neighbor, so "any" would only be drawn
+
     # ########  D* Lite core functions  ########
-    def initialize(self, resolution, start_coord, goal_coord, heuristic_func=lpa.l1_dist):
+    def initialize(self, resolution, start_coord, goal_coord, heuristic_func=None, cost_map=None, connectivity=4):
+        if connectivity not in self._connectivities:
+            raise ValueError("Connectivity must be one of {0}: {1}".format(self._connectivities, connectivity))
+
         # init the containers
-        self._h = heuristic_func  # expects a lambda that can be called
-        self._U = dpq.DualPriorityQueue()
+        self._h = heuristic_func or lpa.default_heuristic(connectivity)  # expects a lambda that can be called
+
+        # set up the map/grid
+        x_res, y_res = resolution
+        self._width = x_res
+        self._height = y_res
+        self._node_count = x_res * y_res
+        self._costs = vs.VertexStore(x_res, y_res, EDGE_WEIGHT)  # flat g/rhs buffers plus a bit-packed wall mask
+        if cost_map is not None:
+            self._costs.load_weights(cost_map)  # cost_map[x][y] is the cost of stepping into (x, y)
+        self._connectivity = connectivity
+        self._diagonal = connectivity != 4
+        self._directions = lpa.DIRECTIONS + lpa.DIAGONALS if self._diagonal else lpa.DIRECTIONS
+        self._neighbors = vs.NeighborTable(x_res, y_res, self._directions, self._costs)  # built once per map
+        self._corners = [(dx * y_res, dy) for dx, dy in self._directions]  # cell id offsets a diagonal step cuts past
+        self._save_map()
+        self._allocate()
+
+        self._begin(start_coord, goal_coord)
+
+    def _begin(self, start_coord, goal_coord):
+        # the state of one search over the map; set up by initialize, and again by reset
         self._km = 0  # used to offset the DPQ, to reduce rebalancing
         self._start = start_coord
         self._last = start_coord
-        self._goal = goal_coord
+        self._goals = lpa.goal_list(goal_coord)  # in the order given
+        self._goal = self._goals[0]
         self._path = []
         self._changed_edges = list()
         self._pop_count = 0
@@ -40,100 +68,225 @@ class DStarLite(lpa.LPAStar):
         self._has_path = False
         self._best_path = None
         self._last_path = None
+        self._raw_path = None
+        self._raw_index = {}
 
-        # set up the map/grid
-        x_res, y_res = resolution
-        self._width = x_res
-        self._height = y_res
-        self._node_count = x_res * y_res
-        self._vertex_costs = [[[float("inf"), float("inf")] for _ in range(y_res)] for _ in range(x_res)]
-        self._is_wall = [[False for _ in range(y_res)] for _ in range(x_res)]
+        # internally, vertices are linear cell ids; coordinates are only used at the API boundary
+        self._start_cell = self._costs.cell_id(start_coord)
+        self._goal_cell = self._costs.cell_id(self._goal)
+        self._goal_cells = set(self._costs.cell_id(goal) for goal in self._goals)
+        self._sources = self._goal_cells  # searching backward, every goal is pinned to rhs 0
+        self._forget_heuristic()  # from the last start, if reset
+        self._U = self._make_queue()  # the queue type depends on the heuristic and map size
 
-        # init the goal node (works backward)
-        self._set_weight_tuple(goal_coord, (Unchanged, 0))
-        prim, sec = self.compute_keys(goal_coord)
-        self._U.push(key=goal_coord, primary=prim, secondary=sec)
+        # init the goal nodes (works backward); with several, g(s) is the distance to the nearest of them
+        for goal in self._goals:
+            cell = self._costs.cell_id(goal)
+            self._costs.rhs[cell] = 0
+            prim, sec = self._cell_keys(cell)
+            self._U.push(key=cell, primary=prim, secondary=sec)
 
         # find the path at least once, so we can take a step if needed
         self.compute_shortest_path()
 
-    def compute_keys(self, coord):
-        h_cost = self._h(self._start, coord)  # heuristic cost from start node to this node
-        cost_tuple = self._get_weight_tuple(coord)
-        secondary = min(cost_tuple)
+    def _cell_keys(self, cell):
+        h_cost = self._h_cache[cell]  # heuristic cost from start node to this node
+        if h_cost is None:
+            h_cost = self._h_cache[cell] = self._heuristic(self._start, self._costs.coord(cell))
+            self._h_cached.append(cell)
+        secondary = min(self._costs.g[cell], self._costs.rhs[cell])
         primary = secondary + h_cost + self._km
+        if self._diagonal or self._costs.weights is not None:
+            return lpa.round_keys(primary, secondary)
         return primary, secondary
 
     # we do not define update_vertex, as it can safely inherit from the superclass
     # note that directionality is inverted, but since our mobility graph is undirected, this is okay
+    # edge costs are not symmetric once cells have their own weights, though, so the lookahead is redefined
+
+    def _lookahead(self, cell):
+        # rhs(s) = min over neighbors s' of c(s, s') + g(s'), where c(s, s') is the length of the step times the cost
+        # of stepping into s'
+        weight = self._costs.get_weight_cell
+        g = self._costs.g
+        targets, kinds = self._neighbors.targets, self._neighbors.kinds
+        best = float("inf")
+        for i in range(self._neighbors.offsets[cell], self._neighbors.offsets[cell + 1]):
+            each, kind = targets[i], kinds[i]
+            candidate = (weight(each) if kind < 4 else self._step_length(cell, kind) * weight(each)) + g[each]
+            if candidate < best:
+                best = candidate
+        return best
 
     def compute_shortest_path(self):
-        g_start, rhs_start = self._get_weight_tuple(self._start)
-        while (self._U.size() > 0 and self._tuple_lt(self._U.peek(), self.compute_keys(self._start))) or \
-                g_start != rhs_start:
-            k_old = self._U.peek()
+        g, rhs = self._costs.g, self._costs.rhs
+        offsets, targets = self._neighbors.offsets, self._neighbors.targets
+        start, goals = self._start_cell, self._goal_cells
+        keys_lt = self._keys_lt()
+        start_g, start_rhs = g[start], rhs[start]
+        start_keys = self._cell_keys(start)  # _km stays put in here, so only a change to g or rhs of start changes it
+        while (self._U.size() > 0 and keys_lt(self._U.top_keys(), start_keys)) or start_g != start_rhs:
+            k_old = self._U.top_keys()
             u = self._U.pop()[0]
             self._pop_count += 1
-            g_u, rhs_u = self._get_weight_tuple(u)
-            if self._tuple_lt(k_old, self.compute_keys(u)):
-                prim, sec = self.compute_keys(u)
-                self._U.push(u, prim, sec)
+            g_u, rhs_u = g[u], rhs[u]
+            k_new = self._cell_keys(u)
+            if keys_lt(k_old, k_new):
+                self._U.push(u, k_new[0], k_new[1])
             elif g_u > rhs_u:
-                self._set_weight_tuple(u, (rhs_u, Unchanged))  # g(u) = rhs(u)
-                for each in self._get_neighbors(u):
-                    self.update_vertex(each, self._goal)
+                g[u] = rhs_u  # g(u) = rhs(u)
+                for each in targets[offsets[u]:offsets[u + 1]]:
+                    self._update_cell(each, goals)
             else:
-                self._set_weight_tuple(u, (float("inf"), Unchanged))  # g(u) = inf
-                for each in self._get_neighbors(u):
-                    self.update_vertex(each, self._goal)
-                self.update_vertex(u, self._goal)
-
-            g_start, rhs_start = self._get_weight_tuple(self._start)  # update for next iteration
+                g[u] = float("inf")  # g(u) = inf
+                for each in targets[offsets[u]:offsets[u + 1]]:
+                    self._update_cell(each, goals)
+                self._update_cell(u, goals)
+            if g[start] != start_g or rhs[start] != start_rhs:
+                start_g, start_rhs = g[start], rhs[start]
+                start_keys = self._cell_keys(start)
         self._has_path = True
 
     # ########  external (pacman) helper functions  ########
     def make_wall_at(self, coord):
-        x, y = coord
+        self.make_walls_at([coord])
 
-        start_neighbors = self._get_neighbors(self._start)
-        if coord not in start_neighbors:
-            raise ValueError("A wall cannot be discovered at a non-adjacent location; this breaks D* Lite.")
-        self._changed_edges.append(coord)
+    def make_walls_at(self, coords):
+        self.apply_edge_changes([(coord, True) for coord in coords])
 
-        self._is_wall[x][y] = True
-        for each in self._get_neighbors(coord):
-            self._changed_edges.append(each)  # add all wall-adjacent edges to the queue to be update_vertex'd
+    def apply_edge_changes(self, changes):
+        # changes is an iterable of (coord, is_wall) pairs seen from the current position; they are applied as one
+        # batch (a single _km update and a single compute_shortest_path), as in the main loop of the D* Lite paper
+        # changes may be anywhere on the map (e.g. from a long-range sensor); the _km offset keeps the keys valid
+        # note that cells which were already walls when the map was initialized cannot be opened up again
+        changes = list(changes)
+        for coord, _ in changes:
+            if not self._in_map(coord):
+                raise ValueError("A wall cannot be discovered outside of the map: {0}".format(coord))
+
+        seen = set()
+        for coord, is_wall in changes:
+            cell = self._costs.cell_id(coord)
+            if self._costs.is_wall_cell(cell) == is_wall:
+                continue  # already known; no edge cost changed
+            self._costs.set_wall_cell(cell, is_wall)
+            for each in [cell] + list(self._neighbors.of(cell)):
+                if each not in seen:
+                    seen.add(each)
+                    self._changed_edges.append(each)  # add all wall-adjacent edges to be update_vertex'd, once
+        if not self._changed_edges:
+            return  # nothing changed, so the current plan is still valid
 
         # process edge updates
-        self._km += self._h(self._last, self._start)
+        changed, self._changed_edges = self._changed_edges, list()  # we'll have updated all the edges
+        self._repair(changed)
+
+    def _repair(self, cells):
+        # path might have changed!
+        self._last_path = self._best_path
+        self._best_path = None
+
+        self._km += self._heuristic(self._last, self._start)
         self._last = self._start
-        for each in self._changed_edges:
-            self.update_vertex(each, self._goal)
-        self._changed_edges = list()  # we've updated all the edges
+        for each in cells:
+            self._update_cell(each, self._goal_cells)
         self.compute_shortest_path()  # find the new shortest path
 
+    def update_cost(self, coord, new_cost):
+        self.update_costs([(coord, new_cost)])
+
+    def update_costs(self, changes):
+        # changes is an iterable of (coord, new_cost) pairs, where a cost is that of stepping into the cell; they are
+        # applied as one batch, like apply_edge_changes. Searching backward, a changed cost only affects the edges into
+        # the cell, i.e. the rhs of its neighbors (its predecessors); as in the optimized D* Lite of the paper, a cheaper
+        # cell can only lower their rhs, and a dearer one only matters to those whose rhs went through it
+        g, rhs = self._costs.g, self._costs.rhs
+        affected = []
+        for coord, new_cost in changes:
+            old_cost = self._costs.get_weight(coord) if self._in_map(coord) else None
+            cell = self._set_cell_weight(coord, new_cost)
+            if cell is None:
+                continue  # already known; no edge cost changed
+            for u, length in self._edges(cell):
+                if u in self._goal_cells or self._costs.is_wall_cell(u):
+                    continue  # a goal's rhs is fixed at 0, and a wall's at infinity
+                if new_cost < old_cost:
+                    if length * new_cost + g[cell] < rhs[u]:
+                        rhs[u] = length * new_cost + g[cell]
+                        affected.append(u)
+                elif rhs[u] == length * old_cost + g[cell]:
+                    rhs[u] = self._lookahead(u)
+                    affected.append(u)
+        if not affected:
+            return  # nothing changed, so the current plan is still valid
+
+        # path might have changed!
+        self._last_path = self._best_path
+        self._best_path = None
+
+        # re-queue the affected vertices with their new rhs, then repair
+        self._km += self._heuristic(self._last, self._start)
+        self._last = self._start
+        for u in affected:
+            self._U.delete_key(u)
+            if g[u] != rhs[u]:
+                prim, sec = self._cell_keys(u)
+                self._U.push(key=u, primary=prim, secondary=sec)
+        self.compute_shortest_path()  # find the new shortest path
+
+    def move_start(self, coord):
+        # e.g. after the agent was moved by something else than take_step. searching backward, the start is only where
+        # the path is read off from, so no g-value changes; as in the main loop of the paper, _km makes up for the
+        # heuristic of the queued keys now being measured from elsewhere, and the new start is settled if it is not yet
+        if not self._in_map(coord):
+            raise ValueError("The start cannot be moved outside of the map: {0}".format(coord))
+        cell = self._costs.cell_id(coord)
+        if cell == self._start_cell:
+            return
+        self._path.append(self._start)
+        self._start, self._start_cell = coord, cell
+        self._forget_heuristic()  # measured from the start
+        self._best_path = None  # the cached path starts from where we were
+        self._km += self._heuristic(self._last, self._start)
+        self._last = self._start
+        self.compute_shortest_path()
+
+    def _goals_changed(self, cell):
+        # searching backward, the goals are where the search grows from: a new goal is pinned at rhs 0, a removed one
+        # takes its rhs from its neighbors again, and the vertices whose nearest goal changed are repaired, as after
+        # any edge change
+        if cell in self._goal_cells:
+            self._costs.rhs[cell] = 0
+        self._repair([cell])
+
     def take_step(self):
-        if self._start == self._goal:
-            return self._start  # we're already at the goal; no need to move
+        if self._start_cell in self._goal_cells:
+            return self._start  # we're already at a goal; no need to move
 
-        g_start, rhs_start = self._get_weight_tuple(self._start)
-        if g_start == float("inf"):
+        g = self._costs.g
+        if g[self._start_cell] == float("inf"):
             return self._start  # no path exists; no need to move
 
         # move according to our best guess
         argmin = (None, float("inf"))
-        for each in self._get_neighbors(self._start):
-            weight = EDGE_WEIGHT + self._get_weight_tuple(each)[0]
+        for each, length in self._edges(self._start_cell):
+            weight = length * self._costs.get_weight_cell(each) + g[each]
             if weight < argmin[1]:
                 argmin = (each, weight)
         self._path.append(self._start)
-        self._start = argmin[0]
+        self._start_cell = argmin[0]
+        self._start = self._costs.coord(self._start_cell)
+        self._forget_heuristic()  # measured from the start
+        self._best_path = None  # the cached path starts from where we were
 
         return self._start
 
     def extract_path(self, placeholder=None):
         return super(DStarLite, self).extract_path(backward=False)  # override gradient direction
 
+    def iter_path(self, placeholder=None):
+        return super(DStarLite, self).iter_path(backward=False)  # lazily, from the start
+
     def get_route(self):
         res = list(self._path)
         res.append(self._start)
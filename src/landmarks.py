@@ -0,0 +1,140 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# ALT heuristic (A*, landmarks and the triangle inequality), based on the following paper:
+# "Computing the shortest path: A* search meets graph theory"
+# https://dl.acm.org/doi/10.5555/1070432.1070455
+#
+
+# imports
+import heapq
+import math
+from array import array
+
+from src import lifelong_planning_a_star as lpa
+
+# global variables
+DEFAULT_COUNT = 8
+UNREACHABLE = -1  # in a distance table
+
+
+# for any landmark L, |d(L, a) - d(L, b)| <= d(a, b) by the triangle inequality, so the largest such difference over a
+# few landmarks is an admissible and consistent heuristic that, unlike the coordinate distances, knows about walls.
+# it is taken on the map as given; walls found later only make distances longer, so it stays a lower bound, but costs
+# must not drop below the given ones afterwards
+class LandmarkHeuristic:
+    def __init__(self, resolution, walls=None, cost_map=None, count=DEFAULT_COUNT, connectivity=4,
+                 heuristic_func=None, seed=None):
+        # walls and cost_map are indexable as [x][y], like VertexStore.load_walls and load_weights take them. the
+        # landmarks are spread over the part of the map that can be reached from seed (by default, the first open
+        # cell in cell id order), each the farthest cell from those chosen before it. the result is never less than
+        # heuristic_func (by default that of the planners for the connectivity), which it is combined with
+        x_res, y_res = resolution
+        self._height = y_res
+        self._count = x_res * y_res
+        self._open = bytearray(self._count)
+        for x in range(x_res):
+            for y in range(y_res):
+                self._open[x * y_res + y] = not (walls is not None and walls[x][y])
+        self._weights = None
+        if cost_map is not None:
+            self._weights = array("d", [cost_map[x][y] for x in range(x_res) for y in range(y_res)])
+        self._diagonal = connectivity != 4
+        self._h = heuristic_func or lpa.default_heuristic(connectivity)
+        self._landmarks = []  # cell ids
+        self._tables = []  # one distance table per landmark, indexed by cell id
+        self._select(count, seed)
+
+    def __call__(self, coord1, coord2):
+        cell1 = coord1[0] * self._height + coord1[1]
+        cell2 = coord2[0] * self._height + coord2[1]
+        best = self._h(coord1, coord2)
+        for table in self._tables:
+            d1, d2 = table[cell1], table[cell2]
+            if d1 == UNREACHABLE or d2 == UNREACHABLE:
+                continue  # not on the landmark's part of the map
+            if d1 - d2 > best:
+                best = d1 - d2
+            elif d2 - d1 > best:
+                best = d2 - d1
+        return best
+
+    def landmarks(self):
+        return [divmod(cell, self._height) for cell in self._landmarks]
+
+    def nbytes(self):
+        return sum(table.itemsize * len(table) for table in self._tables)
+
+    def _select(self, count, seed):
+        # farthest-point selection: the first landmark is the cell farthest from the seed, and every next one the cell
+        # farthest from all the landmarks so far (the first of equals, in cell id order)
+        if seed is not None:
+            source = seed[0] * self._height + seed[1]
+        else:
+            source = next((cell for cell in range(self._count) if self._open[cell]), None)
+            if source is None:
+                return  # nothing but walls
+        nearest = self._distances(source)  # the seed only picks the first landmark; it is not one itself
+        for _ in range(count):
+            farthest = max(range(self._count), key=nearest.__getitem__)
+            if self._landmarks and nearest[farthest] <= 0:
+                break  # every reachable cell is a landmark already
+            table = self._distances(farthest)
+            if not self._landmarks:
+                nearest = array(table.typecode, table)
+            self._landmarks.append(farthest)
+            self._tables.append(table)
+            for cell in range(self._count):
+                if table[cell] < nearest[cell]:
+                    nearest[cell] = table[cell]
+
+    def _distances(self, source):
+        # the distance from source to every cell, or UNREACHABLE: breadth-first on a plain 4-connected map, so that the
+        # table holds small integers (and the heuristic stays integral for the bucket queue); otherwise Dijkstra
+        if not self._diagonal and self._weights is None:
+            table = array("i", [UNREACHABLE]) * self._count
+            table[source] = 0
+            frontier = [source]
+            for cell in frontier:
+                step = table[cell] + 1
+                for each in self._neighbors(cell):
+                    if table[each] == UNREACHABLE:
+                        table[each] = step
+                        frontier.append(each)
+            return table
+
+        # edges are made symmetric by charging the cheaper of the two cells, and diagonal steps are never blocked by
+        # wall corners; both can only make distances shorter, which keeps the differences lower bounds of the real ones
+        table = array("d", [UNREACHABLE]) * self._count
+        settled = bytearray(self._count)
+        queue = [(0, source)]
+        table[source] = 0
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            if settled[cell]:
+                continue
+            settled[cell] = 1
+            for each in self._neighbors(cell):
+                length = 1 if each - cell in (1, -1, self._height, -self._height) else math.sqrt(2)
+                if self._weights is not None:
+                    length *= min(self._weights[cell], self._weights[each])
+                if table[each] == UNREACHABLE or distance + length < table[each]:
+                    table[each] = distance + length
+                    heapq.heappush(queue, (distance + length, each))
+        return table
+
+    def _neighbors(self, cell):
+        # the open cells next to cell (diagonally too, on an 8-connected map)
+        height = self._height
+        x, y = divmod(cell, height)
+        steps = lpa.DIRECTIONS + lpa.DIAGONALS if self._diagonal else lpa.DIRECTIONS
+        neighbors = []
+        for dx, dy in steps:
+            if 0 <= y + dy < height and 0 <= (x + dx) * height + y + dy < self._count:
+                each = cell + dx * height + dy
+                if self._open[each]:
+                    neighbors.append(each)
+        return neighbors
@@ -10,19 +10,34 @@
 
 
 # imports
-import collections
 import math
+import numbers
+import operator
+
+try:
+    from collections.abc import Iterable
+except ImportError:  # python 2
+    from collections import Iterable
 
 from src import dual_priority_queue as dpq
+from src import vertex_store as vs
 
 # global variables
 EDGE_WEIGHT = 1
-Unchanged = None  # alias to improve semantic readability
+SQRT2 = math.sqrt(2)
+KEY_DIGITS = 9  # keys on fractional maps are compared to within 10 ** -KEY_DIGITS; see round_keys
+VALIDATE_KEYS = False  # compare keys with the checking _tuple_lt rather than as plain tuples; for debugging
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # north, east, south, west; also the neighbor visiting order
+DIAGONALS = [(1, -1), (1, 1), (-1, 1), (-1, -1)]  # north-east, south-east, south-west, north-west; visited last
+CONNECTIVITIES = (4, 8, "any")  # "any" plans 8-connected, then straightens the path along lines of sight
+WALKED_CONNECTIVITIES = (4, 8)  # D* Lite and D* walk their path one grid step at a time, so it is never straightened
 
 
 # assumptions:
-# all edge weights are either 1 (adjacent) or infinity (non-adjacent or walls)
+# all edge weights are either 1 (adjacent) or infinity (non-adjacent or walls), unless a cost map is given; then the
+# weight of an edge is the (positive) cost of the cell it steps into, and the heuristic must not overestimate it
 # 2-dimensional, rectilinear map; all squares which are adjacent are connected by default
+# with 8-connectivity, diagonal steps are sqrt(2) times as long, and may not cut past the corner of a wall
 
 
 # baseline distance metrics
@@ -36,102 +51,267 @@ def l2_dist(coord1, coord2):
     return math.sqrt(((q1 - p1) ** 2) + ((q2 - p2) ** 2))
 
 
+def octile_dist(coord1, coord2):
+    p1, p2, q1, q2 = coord1 + coord2
+    dx, dy = abs(p1 - q1), abs(p2 - q2)
+    return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)  # straight, then diagonal; exact on an open 8-connected map
+
+
+def round_keys(primary, secondary):
+    # with sqrt(2) steps or fractional costs, keys are inexact: two sums which are equal but were added up in a
+    # different order can differ in the last bit. snapping them to multiples of 10 ** -KEY_DIGITS is in effect an
+    # epsilon, not exact arithmetic: keys closer than that nearly always tie (two on either side of a rounding boundary
+    # stay one multiple apart), and keys further apart keep their order. what the search needs is that the queue and
+    # its termination test compare the same keys, so that they agree on which of two comes first; otherwise a key a
+    # bit higher in primary but lower in secondary could hide behind the top, and the search stop before reaching it.
+    # a near-tie broken the other way costs a pop, or a path a rounding error longer than the shortest
+    return round(primary, KEY_DIGITS), round(secondary, KEY_DIGITS)
+
+
+def default_heuristic(connectivity):
+    return l1_dist if connectivity == 4 else octile_dist
+
+
+def goal_list(goal_coord):
+    # a goal is either one (x, y) coordinate, or any iterable of them; the path then leads to the nearest of those
+    if len(goal_coord) == 2 and all(isinstance(each, numbers.Number) for each in goal_coord):
+        return [tuple(goal_coord)]
+    goals = []
+    for each in goal_coord:
+        if tuple(each) not in goals:
+            goals.append(tuple(each))
+    if not goals:
+        raise ValueError("At least one goal is needed")
+    return goals
+
+
 # noinspection PyAttributeOutsideInit
 class LPAStar:
-    def __init__(self, resolution, start_coord, goal_coord, heuristic_func=l1_dist):
-        self.initialize(resolution, start_coord, goal_coord, heuristic_func)
+    _connectivities = CONNECTIVITIES  # the ones this planner accepts; see WALKED_CONNECTIVITIES
+
+    def __init__(self, resolution, start_coord, goal_coord, heuristic_func=None, cost_map=None, connectivity=4):
+        self.initialize(resolution, start_coord, goal_coord, heuristic_func, cost_map, connectivity)
 
     # ########  LPA* core functions  ########
-    def initialize(self, resolution, start_coord, goal_coord, heuristic_func):
+    def initialize(self, resolution, start_coord, goal_coord, heuristic_func, cost_map=None, connectivity=4):
+        if connectivity not in self._connectivities:
+            raise ValueError("Connectivity must be one of {0}: {1}".format(self._connectivities, connectivity))
+
         # init the containers
-        self._h = heuristic_func  # expects a lambda that can be called
-        self._U = dpq.DualPriorityQueue()
-        self._start = start_coord
-        self._goal = goal_coord
-        self._has_path = False
-        self._best_path = None
-        self._last_path = None
-        self._pop_count = 0
+        self._h = heuristic_func or default_heuristic(connectivity)  # expects a lambda that can be called
 
         # set up the map/grid
         x_res, y_res = resolution
         self._width = x_res
         self._height = y_res
         self._node_count = x_res * y_res
-        self._vertex_costs = [[[float("inf"), float("inf")] for _ in range(y_res)] for _ in range(x_res)]
-        self._is_wall = [[False for _ in range(y_res)] for _ in range(x_res)]
+        self._costs = vs.VertexStore(x_res, y_res, EDGE_WEIGHT)  # flat g/rhs buffers plus a bit-packed wall mask
+        if cost_map is not None:
+            self._costs.load_weights(cost_map)  # cost_map[x][y] is the cost of stepping into (x, y)
+        self._connectivity = connectivity
+        if connectivity == "any" and self._costs.weights is not None:
+            raise ValueError("Any-angle paths are straightened past walls only, so they cannot have cell costs")
+        self._diagonal = connectivity != 4
+        self._directions = DIRECTIONS + DIAGONALS if self._diagonal else DIRECTIONS
+        self._neighbors = vs.NeighborTable(x_res, y_res, self._directions, self._costs)  # built once per map
+        self._corners = [(dx * y_res, dy) for dx, dy in self._directions]  # cell id offsets a diagonal step cuts past
+        self._save_map()
+        self._allocate()
+
+        self._begin(start_coord, goal_coord)
+
+    def _begin(self, start_coord, goal_coord):
+        # the state of one search over the map; set up by initialize, and again by reset
+        self._start = start_coord
+        self._goals = goal_list(goal_coord)  # in the order given
+        self._goal = self._goals[0]
+        self._has_path = False
+        self._best_path = None
+        self._last_path = None
+        self._pop_count = 0
+        self._raw_path = None  # the last gradient walk (before any straightening), start to goal
+        self._raw_index = {}  # coord -> its position in _raw_path
+
+        # internally, vertices are linear cell ids; coordinates are only used at the API boundary
+        self._start_cell = self._costs.cell_id(start_coord)
+        self._goal_cell = self._costs.cell_id(self._goal)
+        self._goal_cells = set(self._costs.cell_id(goal) for goal in self._goals)
+        self._sources = (self._start_cell,)  # the cells whose rhs is pinned to 0, i.e. where the search grows from
+        self._forget_heuristic()  # memoized for the last start and goals, if reset
+        self._U = self._make_queue()  # the queue type depends on the heuristic and map size
 
         # init the start node
-        self._set_weight_tuple(start_coord, (Unchanged, 0))
-        prim, sec = self.compute_keys(start_coord)
-        self._U.push(key=start_coord, primary=prim, secondary=sec)
+        self._costs.rhs[self._start_cell] = 0
+        prim, sec = self._cell_keys(self._start_cell)
+        self._U.push(key=self._start_cell, primary=prim, secondary=sec)
+
+    def reset(self, start_coord, goal_coord):
+        # starts over with a new start and goal on the same map, as if just constructed: walls and costs learned
+        # since construction are forgotten. the g/rhs buffers are refilled in place and the neighbor table is
+        # reused, so that running many episodes on one layout does not pay for setting the planner up every time
+        self._costs.reset()
+        self._costs.restore_walls(self._initial_walls)
+        if self._initial_weights is None:
+            self._costs.weights = None
+        else:
+            self._costs.weights[:] = self._initial_weights
+        self._begin(start_coord, goal_coord)
+
+    def _save_map(self):
+        # what reset goes back to
+        self._initial_walls = self._costs.save_walls()
+        self._initial_weights = None if self._costs.weights is None else self._costs.weights[:]
+
+    def _allocate(self):
+        # the per-cell state of a search besides g and rhs, made once per map; _begin clears it, in place
+        self._h_cache = [None] * self._node_count  # cell id -> its heuristic, memoized by _cell_keys
+        self._h_cached = []  # the cells memoized in _h_cache, so that _forget_heuristic need not clear all of it
+        self._U = None  # the queue; made by _begin, and cleared by the next one if it is still of the right kind
 
     def compute_keys(self, coord):
-        heuristic = self._h(coord, self._goal)
-        tup = self._get_weight_tuple(coord)
-        baseline = min(tup)
+        return self._cell_keys(self._costs.cell_id(coord))
+
+    def _cell_keys(self, cell):
+        heuristic = self._h_cache[cell]
+        if heuristic is None:
+            heuristic = self._h_cache[cell] = self._cell_heuristic(cell)
+            self._h_cached.append(cell)
+        baseline = min(self._costs.g[cell], self._costs.rhs[cell])
+        if self._diagonal or self._costs.weights is not None:
+            return round_keys(baseline + heuristic, baseline)
         return baseline + heuristic, baseline
 
+    def _cell_heuristic(self, cell):
+        # searching forward, the heuristic is measured to the nearest goal, so it only changes with the goals
+        if len(self._goals) == 1:
+            return self._heuristic(self._costs.coord(cell), self._goal)
+        coord = self._costs.coord(cell)
+        return min([self._heuristic(coord, goal) for goal in self._goals])  # to the nearest goal
+
+    def _forget_heuristic(self):
+        # the memoized heuristic values are measured to the goals (LPA*) or from the start (D* Lite); once those move,
+        # every cell gets its heuristic anew the next time it is keyed
+        cache = self._h_cache
+        for cell in self._h_cached:
+            cache[cell] = None
+        del self._h_cached[:]
+
     def update_vertex(self, coord, exclusion_node=None):
         if exclusion_node is None:
             exclusion_node = self._start
+        self._update_cell(self._costs.cell_id(coord), (self._costs.cell_id(exclusion_node),))
+
+    def _update_cell(self, cell, excluded_cells):
+        g, rhs = self._costs.g, self._costs.rhs
 
-        # update rhs (if not start node)
-        if coord != exclusion_node:
+        # update rhs (if not a start node of the search: the start of LPA*, any of the goals of D* Lite)
+        if cell not in excluded_cells:
             new_rhs = float("inf")  # if this node is a wall, the new rhs(s) is infinity
-            if not self._is_wall[coord[0]][coord[1]]:
-                neighbors = self._get_neighbors(coord)
-                for each in neighbors:
+            if self._diagonal or self._costs.weights is not None:
+                if not self._costs.is_wall_cell(cell):
+                    new_rhs = self._lookahead(cell)  # edges of different costs; see _lookahead
+            elif not self._costs.is_wall_cell(cell):
+                offsets = self._neighbors.offsets
+                for each in self._neighbors.targets[offsets[cell]:offsets[cell + 1]]:
                     # otherwise, it's [edge cost] more than the lowest neighboring g(s)
-                    g, _ = self._get_weight_tuple(each)
-                    new_rhs = min(new_rhs, g + EDGE_WEIGHT)
-            self._set_weight_tuple(coord, (Unchanged, new_rhs))
+                    candidate = g[each] + EDGE_WEIGHT
+                    if candidate < new_rhs:
+                        new_rhs = candidate
+            rhs[cell] = new_rhs
 
         # remove from PQ
-        self._U.delete_key(coord)
+        self._U.delete_key(cell)
 
         # re-insert if locally underconsistent (inequality partially satisfied by upstream compute_shortest_path)
-        g, rhs = self._get_weight_tuple(coord)
-        if g != rhs:
-            prim, sec = self.compute_keys(coord)
-            self._U.push(key=coord, primary=prim, secondary=sec)
+        if g[cell] != rhs[cell]:
+            prim, sec = self._cell_keys(cell)
+            self._U.push(key=cell, primary=prim, secondary=sec)
+
+    def _lookahead(self, cell):
+        # rhs(s) = min over neighbors s' of g(s') + c(s', s), where c(s', s) is the length of the step times the cost
+        # of stepping into s; only used for weighted or diagonal maps, _update_cell inlines the plain 4-connected loop
+        g = self._costs.g
+        targets, kinds = self._neighbors.targets, self._neighbors.kinds
+        weight = self._costs.get_weight_cell(cell)
+        best = float("inf")
+        for i in range(self._neighbors.offsets[cell], self._neighbors.offsets[cell + 1]):
+            kind = kinds[i]
+            candidate = g[targets[i]] + (weight if kind < 4 else self._step_length(cell, kind) * weight)
+            if candidate < best:
+                best = candidate
+        return best
+
+    def _step_length(self, cell, kind):
+        # length of the step from cell in direction kind (an index into self._directions); a diagonal step may not cut
+        # past the corner of a wall, so it is blocked if either cell beside it is one. stepping back is the same length
+        if kind < 4:
+            return 1
+        x_offset, y_offset = self._corners[kind]
+        if self._costs.is_wall_cell(cell + x_offset) or self._costs.is_wall_cell(cell + y_offset):
+            return float("inf")
+        return SQRT2
+
+    def _edges(self, cell):
+        # (neighbor, step length) pairs, in neighbor visiting order; a wall is infinitely far away
+        targets, kinds = self._neighbors.targets, self._neighbors.kinds
+        is_wall = self._costs.is_wall_cell
+        return [(targets[i], float("inf") if is_wall(targets[i]) else self._step_length(cell, kinds[i]))
+                for i in range(self._neighbors.offsets[cell], self._neighbors.offsets[cell + 1])]
 
     def compute_shortest_path(self):
         if self._has_path:
             return  # don't try to re-compute an already-computed path, the PQ is empty
 
         # implicitly assumes start to goal
-        goal_tup = self._get_weight_tuple(self._goal)
-        goal_keys = self.compute_keys(self._goal)
-        peek_keys = self._U.peek()[1:3]  # slice the peek to get the priority tuple only
-        while (goal_tup[0] != goal_tup[1]) or (self._tuple_lt(peek_keys, goal_keys)):
+        g, rhs = self._costs.g, self._costs.rhs
+        offsets, targets = self._neighbors.offsets, self._neighbors.targets
+        sources = self._sources
+        several = len(self._goals) > 1
+        keys_lt = self._keys_lt()
+        if self._U.size() == 0:
+            self._has_path = True  # e.g. a change that left every vertex consistent; nothing to repair
+            return
+        goal = self._nearest_goal_cell()
+        goal_keys = self._cell_keys(goal)
+        peek_keys = self._U.top_keys()
+        while (g[goal] != rhs[goal]) or (keys_lt(peek_keys, goal_keys)):
             u = self._U.pop()[0]
             self._pop_count += 1
-            g_u, rhs_u = self._get_weight_tuple(u)  # pull these again; they may be different than when it was pushed
+            g_u, rhs_u = g[u], rhs[u]  # pull these again; they may be different than when it was pushed
             if g_u > rhs_u:
                 # locally overconsistent
-                self._set_weight_tuple(u, (rhs_u, Unchanged))  # g(s) = rhs(s)
+                g[u] = rhs_u  # g(s) = rhs(s)
             else:
-                self._set_weight_tuple(u, (float("inf"), Unchanged))  # g(s) = infinity
-                self.update_vertex(u)  # update the vertex itself
-            for s in self._get_neighbors(u):
-                self.update_vertex(s)  # update the successor vertices, in either case
+                g[u] = float("inf")  # g(s) = infinity
+                self._update_cell(u, sources)  # update the vertex itself
+            for s in targets[offsets[u]:offsets[u + 1]]:
+                self._update_cell(s, sources)  # update the successor vertices, in either case
 
             # prep variables for next loop invariant test
             if self._U.size() == 0:
                 break  # all done! the whole graph is consistent
-            goal_tup = self._get_weight_tuple(self._goal)
-            goal_keys = self.compute_keys(self._goal)
-            peek_keys = self._U.peek()[1:3]
+            if several:
+                goal = self._nearest_goal_cell()
+            goal_keys = self._cell_keys(goal)
+            peek_keys = self._U.top_keys()
 
         self._has_path = True
 
+    def _nearest_goal_cell(self):
+        # the goal with the lowest key (ties go to the goal given first). with several goals, the search may stop as
+        # soon as this one is consistent and no queued key is lower: a goal whose true distance were any shorter would
+        # have a lower key itself, and so would have been expanded and made consistent before
+        if len(self._goals) == 1:
+            return self._goal_cell
+        cell_id = self._costs.cell_id
+        return min([cell_id(goal) for goal in self._goals], key=self._cell_keys)
+
     # ########  internal helper functions ########
     def _tuple_lt(self, tup1, tup2):
-        if not isinstance(tup1, collections.Iterable):
+        if not isinstance(tup1, Iterable):
             raise ValueError("Left-side tuple is not iterable: {0}".format(tup1))
 
-        if not isinstance(tup2, collections.Iterable):
+        if not isinstance(tup2, Iterable):
             raise ValueError("Right-side tuple is not iterable: {0}".format(tup2))
 
         if len(tup1) == 2:
@@ -155,36 +335,114 @@ class LPAStar:
         else:
             return t1_secondary < t2_secondary  # secondaries break tied primaries
 
+    def _keys_lt(self):
+        # keys are (primary, secondary) tuples, which compare primary first natively; this runs at least once per pop,
+        # so the checking _tuple_lt is only used when VALIDATE_KEYS is set. this and the queue compare the same keys,
+        # which on fractional maps are rounded before either sees them (see round_keys), so both agree on near-ties
+        return self._tuple_lt if VALIDATE_KEYS else operator.lt
+
+    def _make_queue(self):
+        # unit edge weights plus an integral heuristic keep every key a small integer, so bucket them. the probe only
+        # samples the heuristic, though; _heuristic moves the queue over to the heap on the first fractional value
+        probe = self._h(self._start, self._goal)
+        if isinstance(EDGE_WEIGHT, numbers.Integral) and isinstance(probe, numbers.Integral) and \
+                self._costs.weights is None and not self._diagonal:
+            kind, args = dpq.BucketPriorityQueue, (self._width + self._height,)
+        else:
+            kind, args = dpq.DualPriorityQueue, ()  # fractional or widely spread keys (l2_dist, diagonals, a cost map)
+        if isinstance(self._U, kind):
+            self._U.clear()  # reset; the last search's queue is emptied in place rather than made anew
+            return self._U
+        return kind(*args)
+
+    def _use_heap(self):
+        # keys are no longer small integers; move everything queued so far over to the general heap, in order
+        if isinstance(self._U, dpq.BucketPriorityQueue):
+            queue = dpq.DualPriorityQueue()
+            while self._U.size() > 0:
+                key, prim, sec = self._U.pop()
+                queue.push(key, prim, sec)
+            self._U = queue
+
+    def _heuristic(self, coord1, coord2):
+        # every heuristic value a key is made of comes through here, so that a heuristic which is integral only
+        # between some cells is caught before its first fractional value reaches a bucketed queue
+        value = self._h(coord1, coord2)
+        if not isinstance(value, numbers.Integral):
+            self._use_heap()
+        return value
+
+    def _set_cell_weight(self, coord, new_cost):
+        # validates a new traversal cost and stores it; returns the cell id if the cost actually changed, else None
+        if not self._in_map(coord):
+            raise ValueError("A cost cannot be changed outside of the map: {0}".format(coord))
+        if not 0 < new_cost < float("inf"):
+            raise ValueError("A cost must be positive and finite (use walls instead): {0}".format(new_cost))
+        if self._connectivity == "any":
+            raise ValueError("Any-angle paths are straightened past walls only, so they cannot have cell costs")
+        cell = self._costs.cell_id(coord)
+        if self._costs.get_weight_cell(cell) == new_cost:
+            return None
+        self._use_heap()
+        self._costs.set_weight_cell(cell, new_cost)
+        return cell
+
     def _in_map(self, coord):
         x, y = coord
         return 0 <= x < self._width and 0 <= y < self._height
 
     def _get_neighbors(self, coord):
-        all_dirs = [(coord[0], coord[1] - 1),  # north
-                    (coord[0] + 1, coord[1]),  # east
-                    (coord[0], coord[1] + 1),  # south
-                    (coord[0] - 1, coord[1])]  # west
+        all_dirs = [(coord[0] + dx, coord[1] + dy) for dx, dy in self._directions]  # north, east, south, west, ...
         valid_dirs = []
         for each in all_dirs:
             if self._in_map(each):
                 valid_dirs.append(each)
         return valid_dirs
 
-    def _set_weight_tuple(self, coord, tup):
-        x, y = coord
-        if tup[0] is not Unchanged:
-            self._vertex_costs[x][y][0] = tup[0]
-        if tup[1] is not Unchanged:
-            self._vertex_costs[x][y][1] = tup[1]
+    def _line_of_sight(self, coord1, coord2):
+        # walks every cell the segment between the two cell centers touches; where it passes exactly through a corner,
+        # both cells beside it count, so that (like a diagonal step) a line of sight never squeezes past a wall corner
+        x, y = coord1
+        x_end, y_end = coord2
+        dx, dy = abs(x_end - x), abs(y_end - y)
+        sx, sy = (1 if x_end > x else -1), (1 if y_end > y else -1)
+        error = dx - dy
+        while (x, y) != (x_end, y_end):
+            if self._costs.is_wall((x, y)):
+                return False
+            if error > 0:
+                x += sx
+                error -= 2 * dy
+            elif error < 0:
+                y += sy
+                error += 2 * dx
+            else:
+                if self._costs.is_wall((x + sx, y)) or self._costs.is_wall((x, y + sy)):
+                    return False
+                x += sx
+                y += sy
+                error += 2 * (dx - dy)
+        return not self._costs.is_wall((x, y))
+
+    def _straighten(self, path):
+        # any-angle post-processing: drop every waypoint that the last kept one can see past, which turns staircases
+        # of grid steps into straight segments between wall corners (walls only; cell weights are not considered)
+        straight = [path[0]]
+        for index in range(1, len(path) - 1):
+            if not self._line_of_sight(straight[-1], path[index + 1]):
+                straight.append(path[index])
+        straight.append(path[-1])
+        return straight
 
     def _get_weight_tuple(self, coord):
-        x, y = coord
-        return self._vertex_costs[x][y]
+        return self._costs.get(coord)
 
     # ########  external (pacman) helper functions  ########
 
     def make_wall_at(self, coord):
-        x, y = coord
+        cell = self._costs.cell_id(coord)
+        if self._costs.is_wall_cell(cell):
+            return  # a wall already known changes nothing, so the current plan is still valid
 
         # path might have changed!
         self._has_path = False
@@ -192,41 +450,194 @@ class LPAStar:
         self._best_path = None
 
         # "update the edge weights", or more accurately, update the adjacent, affected vertices
-        self._is_wall[x][y] = True
-        self.update_vertex(coord)
+        self._costs.set_wall_cell(cell)
+        self._update_cell(cell, self._sources)
+        if self._diagonal:
+            for each in self._neighbors.of(cell):
+                self._update_cell(each, self._sources)  # diagonal steps past the new wall's corners are blocked now
+
+    def make_walls_at(self, coords):
+        # the walls seen from one position, as one batch: those already known are skipped, so the path is only thrown
+        # away if one of them is new; the search is lazy, so it runs once for the batch, on the next extract_path
+        for coord in coords:
+            self.make_wall_at(coord)
+
+    def move_start(self, coord):
+        # re-roots the search tree at a new start, e.g. where the agent now stands. the start is the one vertex whose
+        # rhs is pinned to 0, as if by a zero-cost edge from a virtual source; moving it changes two of those edges,
+        # which is repaired like any other edge change: g-values are kept, and only the vertices whose distance from
+        # the start changed (and could matter for the goal) are expanded again. the goal stays put, so the keys do too
+        if not self._in_map(coord):
+            raise ValueError("The start cannot be moved outside of the map: {0}".format(coord))
+        cell = self._costs.cell_id(coord)
+        if cell == self._start_cell:
+            return
+
+        # path might have changed!
+        self._has_path = False
+        self._last_path = self._best_path
+        self._best_path = None
+
+        old_start = self._start_cell
+        self._start, self._start_cell = coord, cell
+        self._sources = (cell,)
+        self._costs.rhs[cell] = 0
+        self._update_cell(cell, self._sources)  # the new start keeps rhs 0, and is queued if its g is not 0 yet
+        self._update_cell(old_start, self._sources)  # the old start gets its rhs from its neighbors, like any vertex
+
+    def add_goal(self, coord):
+        # another cell the path may lead to; the path then leads to whichever goal is nearest
+        if not self._in_map(coord):
+            raise ValueError("A goal cannot be placed outside of the map: {0}".format(coord))
+        cell = self._costs.cell_id(coord)
+        if cell in self._goal_cells:
+            return
+        self._goals.append(tuple(coord))
+        self._goal_cells.add(cell)
+        self._goals_changed(cell)
+
+    def remove_goal(self, coord):
+        # e.g. once it has been reached; cells that are not goals are ignored, but the last goal cannot be removed
+        cell = self._costs.cell_id(coord) if self._in_map(coord) else None
+        if cell not in self._goal_cells:
+            return
+        if len(self._goals) == 1:
+            raise ValueError("The last goal cannot be removed: {0}".format(coord))
+        self._goals = [goal for goal in self._goals if self._costs.cell_id(goal) != cell]
+        self._goal_cells.discard(cell)
+        self._goal = self._goals[0]
+        self._goal_cell = self._costs.cell_id(self._goal)
+        self._goals_changed(cell)
+
+    def get_goals(self):
+        return list(self._goals)
+
+    def _goals_changed(self, cell):
+        # searching forward, g(s) is the distance from the start whatever the goals are; only the heuristic (to the
+        # nearest goal) depends on them, so the queued vertices are re-keyed, and nothing is searched again until the
+        # path is asked for
+        self._has_path = False
+        self._last_path = self._best_path
+        self._best_path = None
+        self._forget_heuristic()
+
+        queued = []
+        while self._U.size() > 0:
+            queued.append(self._U.pop()[0])
+        for each in queued:
+            prim, sec = self._cell_keys(each)
+            self._U.push(key=each, primary=prim, secondary=sec)
+
+    def update_cost(self, coord, new_cost):
+        # the cost of stepping into coord changed; searching forward, that is only an edge *into* coord, so only
+        # rhs(coord) needs to be recomputed, whether the cost went up or down
+        cell = self._set_cell_weight(coord, new_cost)
+        if cell is None:
+            return  # nothing changed, so the current plan is still valid
+
+        # path might have changed!
+        self._has_path = False
+        self._last_path = self._best_path
+        self._best_path = None
+        self._update_cell(cell, self._sources)
 
     def extract_path(self, backward=True):
-        if self._start == self._goal:
+        if self._start_cell in self._goal_cells:
             return [self._start]  # trivial case
 
         self.compute_shortest_path()  # if no shortest path is yet available, generate one
         if self._best_path is None:
             # traverses the weights and returns a series of coordinates corresponding to the shortest path
-            best_path = []
-
             if not backward:
-                curr_pos = self._start  # go from start to goal (D*lite)
-                target_pos = self._goal
+                curr_pos = self._start_cell  # go from start to goal (D*lite)
+                target_pos = self._goal_cells  # whichever the gradient leads to
             else:
-                curr_pos = self._goal  # go from goal to start (LPA*)
-                target_pos = self._start
-            if self._get_weight_tuple(curr_pos)[0] == float("inf"):
+                curr_pos = self._nearest_goal_cell()  # go from goal to start (LPA*)
+                target_pos = self._sources
+            if self._costs.g[curr_pos] == float("inf"):
                 return None  # no path between start and goal
 
-            while curr_pos != target_pos:
-                best_path.append(curr_pos)
-                curr_neighbors = self._get_neighbors(curr_pos)
-                for i in range(len(curr_neighbors)):
-                    curr_neighbors[i] = (curr_neighbors[i], self._get_weight_tuple(curr_neighbors[i])[1])
-                curr_neighbors.sort(key=lambda tup: tup[1])
-                curr_pos = curr_neighbors[0][0]
-
-            best_path.append(curr_pos)  # add the goal to the path
-            self._best_path = best_path
+            coord = self._costs.coord
+            raw_path = [coord(cell) for cell in self._walk(curr_pos, target_pos, backward)]
             if backward:
-                self._best_path.reverse()
+                raw_path.reverse()  # walked from the goal back to the start
+            self._raw_path = raw_path
+            self._raw_index = dict((each, position) for position, each in enumerate(raw_path))
+            self._best_path = raw_path
+            if self._connectivity == "any":
+                self._best_path = self._straighten(self._best_path)
         return self._best_path
 
+    def path_index(self):
+        """
+        Maps each coordinate on the current shortest path (see extract_path) to
+        its position in it, for constant-time membership tests and lookups.
+        """
+        path = self.extract_path()
+        if path is None:
+            return {}
+        if path is self._raw_path:
+            return self._raw_index
+        return dict((each, position) for position, each in enumerate(path))
+
+    def iter_path(self, backward=True):
+        """
+        Yields the shortest path from start to (the nearest) goal one coordinate
+        at a time, or nothing if there is none. Only the forward walk (D* Lite)
+        is lazy: it follows the gradient from the start, so each waypoint is
+        found only when it is asked for. LPA*'s g values are distances from the
+        start, so its walk has to begin at the goal; this is then no cheaper
+        than extract_path, which it iterates over. Any map change, new start or
+        new goal invalidates a running iterator.
+        """
+        if self._start_cell in self._goal_cells:
+            yield self._start
+            return
+
+        self.compute_shortest_path()
+        if backward or self._best_path is not None or self._connectivity == "any":
+            for coord in self.extract_path() or ():
+                yield coord
+            return
+
+        if self._costs.g[self._start_cell] == float("inf"):
+            return  # no path between start and goal
+        coord = self._costs.coord
+        for cell in self._walk(self._start_cell, self._goal_cells, backward):
+            yield coord(cell)
+
+    def _walk(self, curr_pos, target_pos, backward):
+        # yields the cells down the gradient from curr_pos to the first of the target_pos cells it reaches, both
+        # included, picking the best neighbor of each with a running argmin (the first of equals, in visiting order).
+        # a shortest path visits no cell twice, so a walk longer than the map has gone round in circles
+        g, rhs = self._costs.g, self._costs.rhs
+        weight = self._costs.get_weight_cell
+        offsets, targets = self._neighbors.offsets, self._neighbors.targets
+        uniform = self._costs.weights is None and not self._diagonal
+        steps = 0
+        while curr_pos not in target_pos:
+            if steps == self._node_count:
+                raise RuntimeError("The path does not reach a goal; the g values are inconsistent")
+            steps += 1
+            yield curr_pos
+            best_pos, best_value = None, None
+            if uniform:
+                for index in range(offsets[curr_pos], offsets[curr_pos + 1]):
+                    value = rhs[targets[index]]
+                    if best_pos is None or value < best_value:
+                        best_pos, best_value = targets[index], value
+            else:
+                step_weight = weight(curr_pos)
+                for each, length in self._edges(curr_pos):
+                    if backward:  # g(s') + c(s', s), as in the paper; the cost of the step from the neighbor into here
+                        value = g[each] + length * step_weight
+                    else:  # c(s, s') + g(s'); the cost of the step from here into the neighbor
+                        value = length * weight(each) + g[each]
+                    if best_pos is None or value < best_value:
+                        best_pos, best_value = each, value
+            curr_pos = best_pos
+        yield curr_pos
+
     def get_path_intersection_point(self):
         if self._last_path is None or self._best_path is None:
             return
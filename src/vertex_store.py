@@ -0,0 +1,147 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+#
+# Compact per-cell planner state (costs, walls and adjacency) shared by LPA* and D* Lite.
+#
+
+# imports
+from array import array
+
+# global variables
+INF = float("inf")
+
+
+class VertexStore:
+    # g and rhs live in two contiguous double buffers and walls in a bit-packed mask, all indexed by linear cell id
+    # (cell id = x * height + y); this costs ~16.1 bytes per cell instead of nested lists per cell
+    # every cell costs the same uniform weight to step into until a per-cell weight is set (or a weight map is loaded),
+    # at which point a third double buffer of weights is allocated
+    __slots__ = ("width", "height", "g", "rhs", "_walls", "weight", "weights")
+
+    def __init__(self, width, height, weight=1):
+        count = width * height
+        self.width = width
+        self.height = height
+        self.g = array("d", [INF]) * count
+        self.rhs = array("d", [INF]) * count
+        self._walls = bytearray((count + 7) >> 3)
+        self.weight = weight
+        self.weights = None
+
+    def cell_id(self, coord):
+        x, y = coord
+        return x * self.height + y
+
+    def coord(self, cell):
+        return divmod(cell, self.height)
+
+    def reset(self):
+        # every g and rhs back to infinity, in place; the buffers (and so any references to them) are kept. the blank
+        # they are copied from only lives for the call, so a store costs no more once reset than before
+        blank = array("d", [INF]) * len(self.g)
+        self.g[:] = blank
+        self.rhs[:] = blank
+
+    def nbytes(self):
+        weights = 0 if self.weights is None else self.weights.itemsize * len(self.weights)
+        return self.g.itemsize * (len(self.g) + len(self.rhs)) + len(self._walls) + weights
+
+    # ########  cost accessors  ########
+    def get(self, coord):
+        cell = coord[0] * self.height + coord[1]
+        return self.g[cell], self.rhs[cell]
+
+    def get_g(self, coord):
+        return self.g[coord[0] * self.height + coord[1]]
+
+    def get_rhs(self, coord):
+        return self.rhs[coord[0] * self.height + coord[1]]
+
+    def set_g(self, coord, value):
+        self.g[coord[0] * self.height + coord[1]] = value
+
+    def set_rhs(self, coord, value):
+        self.rhs[coord[0] * self.height + coord[1]] = value
+
+    # ########  wall accessors  ########
+    def is_wall(self, coord):
+        return self.is_wall_cell(coord[0] * self.height + coord[1])
+
+    def is_wall_cell(self, cell):
+        return (self._walls[cell >> 3] >> (cell & 7)) & 1 == 1
+
+    def set_wall(self, coord, is_wall=True):
+        self.set_wall_cell(coord[0] * self.height + coord[1], is_wall)
+
+    def set_wall_cell(self, cell, is_wall=True):
+        if is_wall:
+            self._walls[cell >> 3] |= 1 << (cell & 7)
+        else:
+            self._walls[cell >> 3] &= ~(1 << (cell & 7)) & 0xFF
+
+    def load_walls(self, walls):
+        # accepts anything indexable as walls[x][y], e.g. a list of lists or a pacman Grid
+        for x in range(self.width):
+            base = x * self.height
+            for y, is_wall in enumerate(walls[x]):
+                if is_wall:
+                    self.set_wall_cell(base + y)
+
+    def save_walls(self):
+        # a snapshot of the wall mask (one bit per cell), for restore_walls
+        return bytes(self._walls)
+
+    def restore_walls(self, snapshot):
+        self._walls[:] = snapshot
+
+    # ########  weight (traversal cost) accessors  ########
+    def get_weight(self, coord):
+        return self.get_weight_cell(coord[0] * self.height + coord[1])
+
+    def get_weight_cell(self, cell):
+        return self.weight if self.weights is None else self.weights[cell]
+
+    def set_weight(self, coord, weight):
+        self.set_weight_cell(coord[0] * self.height + coord[1], weight)
+
+    def set_weight_cell(self, cell, weight):
+        if self.weights is None:
+            self.weights = array("d", [self.weight]) * (self.width * self.height)
+        self.weights[cell] = weight
+
+    def load_weights(self, weights):
+        # accepts anything indexable as weights[x][y]; the weight of a cell is the cost of stepping into it
+        self.weights = array("d", [weights[x][y] for x in range(self.width) for y in range(self.height)])
+
+
+class NeighborTable:
+    # CSR-style adjacency: the neighbors of a cell are targets[offsets[cell]:offsets[cell + 1]], as linear cell ids
+    # neighbors are listed in the order of the given (dx, dy) directions, and kinds[i] is the index of the direction
+    # of targets[i]; if a VertexStore is given, cells that are already walls are left out as targets (cells discovered
+    # to be walls later are still listed)
+    __slots__ = ("offsets", "targets", "kinds")
+
+    def __init__(self, width, height, directions, store=None):
+        self.offsets = array("i", [0]) * (width * height + 1)
+        self.targets = array("i")
+        self.kinds = array("b")
+        for x in range(width):
+            for y in range(height):
+                for kind, (dx, dy) in enumerate(directions):
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < width and 0 <= ny < height:
+                        cell = nx * height + ny
+                        if store is None or not store.is_wall_cell(cell):
+                            self.targets.append(cell)
+                            self.kinds.append(kind)
+                self.offsets[x * height + y + 1] = len(self.targets)
+
+    def of(self, cell):
+        return self.targets[self.offsets[cell]:self.offsets[cell + 1]]
+
+    def nbytes(self):
+        return self.offsets.itemsize * len(self.offsets) + \
+            (self.targets.itemsize + self.kinds.itemsize) * len(self.targets)
@@ -76,6 +76,27 @@ map_b.take_step()
 map_b.take_step()
 assert map_b.get_route() == [(0, 0), (1, 0), (0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
 
+# test 4b: the same two walls, discovered as one batch, give the same plan with less repair work
+map_batch = dsl.DStarLite(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+map_batch.take_step()
+pops_before = map_batch._pop_count
+map_batch.make_walls_at([(1, 1), (2, 0)])
+assert map_batch.extract_path() == [(1, 0), (0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
+map_seq = dsl.DStarLite(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+map_seq.take_step()
+map_seq.make_wall_at((1, 1))
+map_seq.make_wall_at((2, 0))
+assert map_batch._pop_count <= map_seq._pop_count
+
+# test 4c: re-discovering known walls changes nothing and triggers no repair
+pops_before, km_before = map_batch._pop_count, map_batch._km
+map_batch.make_walls_at([(1, 1), (2, 0)])
+assert (map_batch._pop_count, map_batch._km) == (pops_before, km_before)
+
+# test 4d: a wall that disappears again is repaired through the same batch API
+map_batch.apply_edge_changes([((1, 1), False)])
+assert map_batch.extract_path() == [(1, 0), (1, 1), (2, 1), (2, 2)]
+
 # test 5: trivial case where goal == start
 map_c = dsl.DStarLite(start_coord=(0, 0), goal_coord=(0, 0), resolution=(10, 10))
 assert map_c.extract_path() == [(0, 0)]
@@ -89,9 +110,164 @@ map_d.make_wall_at((1, 0))
 assert map_d.extract_path() is None
 map_d.take_step()  # can't move, should do nothing
 try:
-    map_d.make_wall_at((2, 0))
+    map_d.make_wall_at((3, 0))
+    assert False
 except ValueError as e:
-    assert "non-adjacent" in str(e)  # cannot insert walls at non-adjacent locations
+    assert "outside" in str(e)  # cannot insert walls outside of the map
+
+# test 7: walls seen from afar (non-adjacent) are repaired just like adjacent ones
+#   ######
+#   #S   #
+#   #    #
+#   # # ##
+#   #  #G#
+#   ######
+map_f = dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4))
+assert map_f.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3)]
+map_f.make_walls_at([(3, 2), (2, 3), (1, 2)])  # a two-cell sensor sees the plug around the goal
+assert map_f.extract_path() is None
+map_f.apply_edge_changes([((3, 2), False)])
+assert map_f.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3)]
+map_f.take_step()
+map_f.make_walls_at([(3, 0)])  # a wall two cells ahead; no need to walk up to it first
+assert map_f.extract_path() == [(1, 0), (2, 0), (2, 1), (3, 1), (3, 2), (3, 3)]
+
+# test 8: weighted cells (mud in the middle column) make the longer way around cheaper
+#   #####
+#   #S~ #    ~ costs 5 to step into
+#   # ~ #
+#   #  G#
+#   #####
+mud = [[1, 1, 1], [5, 5, 1], [1, 1, 1]]  # indexed as mud[x][y]
+map_w = dsl.DStarLite(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3), cost_map=mud)
+assert map_w.extract_path() == [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
+assert map_w.take_step() == (0, 1)
+
+# test 8b: incremental cost changes, both up and down, match planning from scratch
+map_w.update_cost((0, 2), 9)  # the bottom row got muddy; wading through the middle is cheaper now
+assert map_w.extract_path() == [(0, 1), (1, 1), (2, 1), (2, 2)]
+map_w.update_costs([((1, 1), 9), ((1, 0), 1)])  # the middle got worse, and the top row dried up
+assert map_w.extract_path() == [(0, 1), (0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+map_w.update_cost((2, 1), 0.5)  # fractional costs work too
+assert map_w.extract_path() == [(0, 1), (0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+for start in [(0, 1), (0, 2), (2, 0)]:
+    fresh = dsl.DStarLite(start_coord=start, goal_coord=(2, 2), resolution=(3, 3),
+                          cost_map=[[1, 1, 9], [1, 9, 1], [1, 0.5, 1]])
+    map_x = dsl.DStarLite(start_coord=start, goal_coord=(2, 2), resolution=(3, 3), cost_map=mud)
+    map_x.update_costs([((0, 2), 9), ((1, 1), 9), ((1, 0), 1), ((2, 1), 0.5)])
+    assert map_x._costs.g[map_x._start_cell] == fresh._costs.g[fresh._start_cell]
+    assert map_x.extract_path() == fresh.extract_path()
+pops = map_w._pop_count
+map_w.update_cost((1, 1), 9)
+assert map_w._pop_count == pops  # unchanged costs trigger no repair
+assert map_w.take_step() == (0, 0)
+try:
+    map_w.update_cost((3, 3), 2)
+    assert False
+except ValueError as e:
+    assert "outside" in str(e)
+
+# test 9: 8-connectivity, with walls discovered along the way
+#   ######
+#   #S...#
+#   # ## #
+#   #   .#
+#   #   G#
+#   ######
+map_o = dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4), connectivity=8)
+assert map_o.extract_path() == [(0, 0), (1, 1), (2, 2), (3, 3)]
+map_o.make_walls_at([(1, 1)])
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (3, 3)]  # no cutting past the corner
+assert map_o.take_step() == (1, 0)
+map_o.make_walls_at([(2, 1)])
+assert map_o.extract_path() == [(1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3)]
+try:
+    dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4), connectivity="any")
+    assert False  # take_step walks one grid step at a time, so the path would never be walked straightened
+except ValueError as e:
+    assert "Connectivity" in str(e)
+
+# test 10: the path is walked lazily from the start, one waypoint at a time
+map_o = dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4))
+map_o.make_walls_at([(1, 1), (2, 2)])
+waypoints = map_o.iter_path()
+assert next(waypoints) == (0, 0)
+assert map_o._best_path is None  # nothing was extracted
+assert [(0, 0)] + list(waypoints) == map_o.extract_path()
+map_o.take_step()
+assert list(map_o.iter_path()) == map_o.extract_path()
+
+# test 11: a reset planner starts over from a new position, as a new one would
+map_o = dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4))
+map_o.make_walls_at([(1, 1), (2, 2)])
+map_o.take_step()
+map_o.reset((3, 0), (0, 3))
+fresh = dsl.DStarLite(start_coord=(3, 0), goal_coord=(0, 3), resolution=(4, 4))
+assert map_o.extract_path() == fresh.extract_path()
+assert map_o.get_route() == [(3, 0)]
+assert list(map_o._costs.g) == list(fresh._costs.g)
+
+# test 12: with several goals, the path leads to the nearest; as they are reached, they are removed and the start moved
+map_o = dsl.DStarLite(start_coord=(0, 0), goal_coord=[(3, 0), (0, 3), (3, 3)], resolution=(4, 4))
+map_o.make_walls_at([(1, 1), (2, 2)])
+assert map_o.extract_path()[-1] == (3, 0)
+for goal, expected in [((3, 0), (3, 3)), ((3, 3), (0, 3))]:
+    map_o.move_start(goal)
+    map_o.remove_goal(goal)
+    path = map_o.extract_path()
+    assert path[0] == goal and path[-1] == expected and len(path) == 4
+map_o.add_goal((1, 3))
+assert map_o.extract_path() == [(3, 3), (2, 3), (1, 3)]
+assert map_o.get_route() == [(0, 0), (3, 0), (3, 3)]
+
+# test 13: the heuristic is memoized per cell, and measured anew from wherever the start has moved to
+map_o = dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4))
+cell = map_o._costs.cell_id((3, 3))
+assert map_o._h_cache[cell] == 6
+map_o.take_step()
+assert map_o._h_cache[cell] is None
+primary, secondary = map_o.compute_keys((3, 3))
+assert primary == secondary + 5 + map_o._km
+assert map_o._h_cache[cell] == 5
+
+# test 14: on 8-connected maps, keys tied but for rounding are queued in order, so the search does not stop short of
+# one and leave the path to be walked over stale g values (this one used to go round in circles)
+map_o = dsl.DStarLite(resolution=(12, 8), start_coord=(8, 6), goal_coord=(1, 2), connectivity=8)
+map_o.apply_edge_changes([((0, 2), True), ((3, 1), True)])
+map_o.apply_edge_changes([((6, 1), True), ((8, 4), True)])
+map_o.apply_edge_changes([((7, 2), True)])
+map_o.apply_edge_changes([((1, 4), False), ((2, 1), True)])
+map_o.take_step()
+assert map_o.take_step() == (6, 6)
+map_o.apply_edge_changes([((4, 0), False), ((2, 2), True), ((3, 4), True)])
+assert map_o.extract_path() == [(6, 6), (6, 5), (5, 4), (4, 3), (3, 3), (2, 3), (1, 3), (1, 2)]
+assert abs(map_o._costs.get_g((6, 6)) - (5 + 2 * math.sqrt(2))) < 1e-9
+
+# test 15: a walk over inconsistent g values that goes round in circles is stopped, rather than left to run forever
+map_o = dsl.DStarLite(start_coord=(0, 0), goal_coord=(2, 0), resolution=(3, 1))
+for each in [map_o._costs.g, map_o._costs.rhs]:
+    each[map_o._costs.cell_id((1, 0))] = 0
+    each[map_o._costs.cell_id((2, 0))] = 5
+try:
+    list(map_o._walk(map_o._start_cell, map_o._goal_cells, False))
+    assert False, "the walk should have been stopped"
+except RuntimeError:
+    pass
+
+# test 16: removing goals on an 8-connected map re-keys their cells; a removed goal's key, tied but for rounding with
+# one queued ahead of it, is still processed before the search stops (this one used to go round in circles too)
+map_o = dsl.DStarLite(resolution=(8, 5), start_coord=(2, 3), goal_coord=(6, 0), connectivity=8)
+map_o.reset((5, 0), [(1, 2)])
+map_o.add_goal((2, 1))
+map_o.make_wall_at((3, 3))
+map_o.move_start((5, 3))
+map_o.add_goal((0, 1))
+map_o.move_start((4, 0))
+map_o.make_wall_at((3, 3))
+map_o.remove_goal((2, 1))
+map_o.remove_goal((1, 2))
+assert map_o.extract_path() == [(4, 0), (3, 0), (2, 0), (1, 0), (0, 1)]
+assert abs(map_o._costs.get_g((4, 0)) - (3 + math.sqrt(2))) < 1e-9
 
 # all done
 print("Testing complete!")
@@ -0,0 +1,126 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+
+# Provides basic testing functionality for the DStar class
+
+import sys
+import enum
+
+sys.path.append("/Users/hwbehren/JetBrains/PycharmProjects/DStarLite")
+
+from src import d_star as ds
+from src import d_star_lite as dsl
+
+# test 1: the point records
+point = ds.Point()
+assert issubclass(ds.Point.PointState, enum.Enum)
+assert point.is_state(ds.Point.PointState.new) and point.get_cost() == 0 and point.get_neighbors() == []
+try:
+    point.set_state(2)
+    assert False, "a point cannot take a state that is not a PointState"
+except ValueError:
+    pass
+
+# test map 1 (no internal walls)
+#   ####
+#   #S #    map A
+#   #.G#
+#   ####
+
+map_a = ds.DStar(start_coord=(0, 0), goal_coord=(1, 1), resolution=(2, 2))
+map_a.take_step()
+map_a.take_step()
+assert map_a.get_route() == [(0, 0), (1, 0), (1, 1)]
+assert map_a.take_step() == (1, 1)  # already there
+
+# test 2: the same paths and costs as D* Lite
+#   #####
+#   #S  #   map B
+#   #.  #
+#   #..G#
+#   #####
+
+map_b = ds.DStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+assert map_b.extract_path() == dsl.DStarLite(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3)).extract_path()
+assert map_b._costs.get_g((0, 0)) == 4
+assert map_b.get_point((0, 0)).get_neighbors() == [(1, 0), (0, 1)]
+
+# test 3: a wall discovered on the path sends a RAISE wave back along it, then the detour is found
+#   #######
+#   #S . G#
+#   #.....#
+#   #######
+map_o = ds.DStar(start_coord=(0, 0), goal_coord=(4, 0), resolution=(5, 2))
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
+map_o.compute_shortest_path = lambda: None  # hold the repair back, to step through it
+map_o.make_walls_at([(2, 0)])
+del map_o.compute_shortest_path
+raised = []
+while map_o.process_state() is not None:
+    raised.append([coord for coord in [(2, 0), (1, 0), (0, 0)] if map_o.is_raised(coord)])
+assert raised[:3] == [[(2, 0)], [(1, 0)], [(0, 0)]]
+assert map_o.extract_path() == [(0, 0), (1, 0), (1, 1), (2, 1), (3, 1), (3, 0), (4, 0)]
+assert map_o.get_state((2, 0)) == ds.Point.PointState.closed
+assert map_o.get_point((2, 0)).get_cost() == float("inf")
+
+# test 4: the same, repaired in one go while walking
+map_o = ds.DStar(start_coord=(0, 0), goal_coord=(4, 0), resolution=(5, 2))
+map_o.take_step()
+map_o.make_walls_at([(2, 0)])
+while map_o.take_step() != (4, 0):
+    pass
+assert map_o.get_route() == [(0, 0), (1, 0), (1, 1), (2, 1), (3, 1), (3, 0), (4, 0)]
+
+# test 5: no path
+map_o = ds.DStar(start_coord=(0, 0), goal_coord=(2, 0), resolution=(3, 2))
+map_o.make_walls_at([(1, 0), (1, 1)])
+assert map_o.extract_path() is None
+assert map_o.take_step() == (0, 0)
+
+# test 6: weights and 8-connectivity come out at the same cost as with D* Lite, as do later cost changes
+costs = [[1, 1, 1, 1], [1, 5, 5, 1], [1, 5, 5, 1], [1, 1, 1, 1]]
+for connectivity in [4, 8]:
+    map_o = ds.DStar(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4), cost_map=costs, connectivity=connectivity)
+    map_l = dsl.DStarLite(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4), cost_map=costs,
+                          connectivity=connectivity)
+    for each in [map_o, map_l]:
+        each.update_costs([((1, 1), 1), ((2, 2), 1)])
+        each.make_walls_at([(1, 0)])
+    assert abs(map_o._costs.get_g((0, 0)) - map_l._costs.get_g((0, 0))) < 1e-9
+    path = map_o.extract_path()
+    assert path[0] == (0, 0) and path[-1] == (3, 3) and (1, 0) not in path
+try:
+    ds.DStar(start_coord=(0, 0), goal_coord=(3, 3), resolution=(4, 4), connectivity="any")
+    assert False  # walked along back pointers, one grid step at a time, like D* Lite
+except ValueError as e:
+    assert "Connectivity" in str(e)
+
+# test 7: with several goals, the path leads to the nearest; as they are reached, they are removed and the start moved
+map_o = ds.DStar(start_coord=(0, 0), goal_coord=[(3, 0), (0, 3), (3, 3)], resolution=(4, 4))
+map_o.make_walls_at([(1, 1), (2, 2)])
+assert map_o.extract_path()[-1] == (3, 0)
+for goal, expected in [((3, 0), (3, 3)), ((3, 3), (0, 3))]:
+    map_o.move_start(goal)
+    map_o.remove_goal(goal)
+    path = map_o.extract_path()
+    assert path[0] == goal and path[-1] == expected and len(path) == 4
+map_o.add_goal((1, 3))
+assert map_o.extract_path() == [(3, 3), (2, 3), (1, 3)]
+assert map_o.get_route() == [(0, 0), (3, 0), (3, 3)]
+
+# test 8: reset forgets what was learned, and plans as if just constructed
+map_o = ds.DStar(start_coord=(0, 0), goal_coord=(4, 0), resolution=(5, 2))
+map_o.make_walls_at([(2, 0)])
+tag, back, queue = map_o._tag, map_o._back, map_o._U
+map_o.reset((0, 0), (4, 0))
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
+assert map_o.get_route() == [(0, 0)]
+assert map_o._tag is tag and map_o._back is back and map_o._U is queue  # refilled in place
+fresh = ds.DStar(start_coord=(0, 0), goal_coord=(4, 0), resolution=(5, 2))
+assert list(map_o._k) == list(fresh._k) and map_o._pop_count == fresh._pop_count
+
+# all done
+print("Testing complete!")
@@ -0,0 +1,74 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+
+# Provides basic testing functionality for the per-layout distance cache of the pacman domain; like the pacman domain
+# itself, this runs under Python 2:
+#   python tests/distance_cache_tests.py
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pacman_domain"))
+
+import distanceCache
+import game
+import layout
+import pacman
+import searchAgents
+
+lines = ["%%%%%%",
+         "%P  .%",
+         "% %% %",
+         "%    %",
+         "%%%%%%"]
+
+# test 1: two loads of one layout have equal walls, but not the same grid; they share one cache
+first, second = layout.Layout(lines), layout.Layout(lines)
+assert first.walls is not second.walls and first.walls == second.walls
+assert distanceCache.getCache(first.walls) is distanceCache.getCache(second.walls)
+assert distanceCache.getCache(first.walls).distance((1, 3), (4, 3)) == 3
+
+
+# test 2: the same with a grid that only defines ==, so that != falls back to comparing identities in Python 2
+class EqualOnlyGrid(game.Grid):
+    def __ne__(self, other):
+        return NotImplemented
+
+
+def equal_only(walls):
+    grid = EqualOnlyGrid(walls.width, walls.height)
+    for x, y in walls.asList():
+        grid[x][y] = True
+    return grid
+
+
+cache = distanceCache.getCache(equal_only(first.walls))
+assert distanceCache.getCache(equal_only(first.walls)) is cache
+
+# test 3: a different layout of the same size gets a cache of its own
+other = layout.Layout(["%%%%%%",
+                       "%P  .%",
+                       "% % %%",
+                       "%    %",
+                       "%%%%%%"])
+assert distanceCache.getCache(other.walls) is not distanceCache.getCache(first.walls)
+assert distanceCache.getCache(other.walls).distance((1, 3), (4, 3)) == 3
+assert distanceCache.getCache(other.walls).distance((4, 1), (4, 3)) == 4  # round the new wall at (4, 2)
+assert distanceCache.getCache(first.walls).distance((4, 1), (4, 3)) == 2
+
+# test 4: mazeDistance looks distances up in the cache, and is 0 where there is no path, as it always was
+state = pacman.GameState()
+state.initialize(layout.Layout(["%%%%%%",
+                                "%P% .%",
+                                "%%%  %",
+                                "%    %",
+                                "%%%%%%"]), 0)
+assert searchAgents.mazeDistance((3, 1), (4, 3), state) == 3
+assert searchAgents.mazeDistance((1, 3), (4, 3), state) == 0  # walled in
+assert distanceCache.getCache(state.getWalls()).distance((1, 3), (4, 3)) == float("inf")
+
+# all done
+print("Testing complete!")
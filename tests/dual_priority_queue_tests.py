@@ -55,6 +55,7 @@ assert pq.size() == 3
 
 # testing PQ exhaustion
 assert pq.peek() == ("key3", 6, 2)
+assert pq.top_keys() == (6, 2)
 assert pq.pop() == ("key3", 6, 2)
 assert pq.min_state() == (6, 1)
 assert pq.size() == 2
@@ -65,5 +66,80 @@ assert pq.pop() == ("key4", 7, 0)
 assert pq.min_state() == (None, 0)
 assert pq.size() == 0
 
+# testing lexicographic order over many keys, with repeated re-prioritization
+import random
+
+rng = random.Random(0)
+pq = dpq.DualPriorityQueue()
+expected = dict()
+for i in range(2000):
+    key = rng.randrange(300)
+    if rng.random() < 0.2:
+        pq.delete_key(key)
+        expected.pop(key, None)
+    else:
+        prim, sec = rng.randrange(50), rng.randrange(50)
+        pq.push(key, prim, sec)
+        expected[key] = (prim, sec)
+assert pq.size() == len(expected)
+min_prim = min(prim for prim, _ in expected.values())
+assert pq.min_state() == (min_prim, sum(1 for prim, _ in expected.values() if prim == min_prim))
+popped = []
+while pq.size() > 0:
+    key, prim, sec = pq.pop()
+    assert expected.pop(key) == (prim, sec)
+    popped.append((prim, sec))
+assert popped == sorted(popped)
+assert len(expected) == 0
+assert pq.peek() is None
+
+# testing that exact ties are broken by insertion order
+pq.push("first", 1, 1)
+pq.push("second", 1, 1)
+pq.push("first", 1, 1)  # re-pushing moves a key to the back of its tie
+assert pq.pop()[0] == "second"
+assert pq.pop()[0] == "first"
+
+# testing that the bucketed queue agrees with the heap-backed queue, including window growth and negative keys
+bq = dpq.BucketPriorityQueue(4)
+hq = dpq.DualPriorityQueue()
+for i in range(3000):
+    key = rng.randrange(200)
+    action = rng.random()
+    if action < 0.2:
+        bq.delete_key(key)
+        hq.delete_key(key)
+    elif action < 0.4:
+        assert bq.pop() == hq.pop()
+    else:
+        prim, sec = rng.randrange(-20, 120), rng.randrange(10)
+        bq.push(key, prim, sec)
+        hq.push(key, prim, sec)
+    assert bq.size() == hq.size()
+    assert bq.min_state() == hq.min_state()
+    assert bq.peek() == hq.peek()
+    assert bq.top_keys() == hq.top_keys()
+while hq.size() > 0:
+    assert bq.pop() == hq.pop()
+assert bq.pop() is None
+assert bq.min_state() == (None, 0)
+
+# testing that a cleared queue is empty, and then orders keys as a new one would
+for queue, new in [(bq, dpq.BucketPriorityQueue(4)), (hq, dpq.DualPriorityQueue())]:
+    queue.push("stale", 5, 0)
+    queue.clear()
+    assert queue.size() == 0 and queue.pop() is None and queue.min_state() == (None, 0)
+    for key, prim, sec in [("a", 3, 1), ("b", 1, 2), ("c", 3, 0), ("d", 1, 2)]:
+        queue.push(key, prim, sec)
+        new.push(key, prim, sec)
+    assert [queue.pop() for _ in range(5)] == [new.pop() for _ in range(5)]
+
+# testing that the bucketed queue rejects fractional priorities
+try:
+    bq.push("key1", 1.5, 0)
+    assert False
+except ValueError as e:
+    assert "integers" in str(e)
+
 # all done
 print("Testing complete!")
@@ -0,0 +1,75 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+
+# Provides basic testing functionality for the LandmarkHeuristic class
+
+import sys
+
+sys.path.append("/Users/hwbehren/JetBrains/PycharmProjects/DStarLite")
+
+from src import d_star_lite as dsl
+from src import landmarks as lm
+from src import lifelong_planning_a_star as lpa
+
+# a wall down the middle, open only at the bottom
+#   #####
+#   #S#G#
+#   # # #
+#   #   #
+#   #####
+walls = [[False, False, False], [True, True, False], [False, False, False]]
+
+# test farthest-point selection: the first landmark is farthest from the first open cell, the next farthest from it
+h = lm.LandmarkHeuristic((3, 3), walls, count=2)
+assert h.landmarks() == [(2, 0), (0, 0)]
+assert h.nbytes() == 2 * 4 * 9  # one table of 4-byte integers per landmark
+
+# test the bound: the walk around the wall is 6 steps, where the manhattan distance is 2
+assert lpa.l1_dist((0, 0), (2, 0)) == 2
+assert h((0, 0), (2, 0)) == h((2, 0), (0, 0)) == 6
+assert h((0, 1), (0, 0)) == 1
+assert h((1, 2), (1, 2)) == 0
+
+# test that no more landmarks are chosen than there are cells to choose
+assert len(lm.LandmarkHeuristic((3, 3), walls, count=20).landmarks()) == 7
+
+# test a weighted, 8-connected map: the bound stays at or below the true cost
+costs = [[1, 1, 1], [1, 1, 1], [1, 3, 2]]
+h = lm.LandmarkHeuristic((3, 3), cost_map=costs, connectivity=8)
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3), cost_map=costs, connectivity=8)
+map_o.extract_path()
+assert 0 < h((0, 0), (2, 2)) <= map_o._costs.get_g((2, 2))
+
+# test the planners with it on a known map: the same paths, with fewer vertices expanded where the manhattan distance
+# leads into a dead end
+#   #########
+#   #########
+#   #S    #G#
+#   # ##### #
+#   #       #
+#   #########
+walls = [[y < 1 or (0 < x < 6 and y == 2) or (x == 5 and y == 1) for y in range(4)] for x in range(7)]
+h = lm.LandmarkHeuristic((7, 4), walls, count=1)
+assert h.landmarks() == [(6, 1)]
+assert h((0, 1), (6, 1)) == 10
+route = [(0, 1), (0, 2), (0, 3), (1, 3), (2, 3), (3, 3), (4, 3), (5, 3), (6, 3), (6, 2), (6, 1)]
+known = [(x, y) for x in range(7) for y in range(4) if walls[x][y]]
+for planner in [lpa.LPAStar, dsl.DStarLite]:
+    plain = planner(start_coord=(0, 1), goal_coord=(6, 1), resolution=(7, 4))
+    guided = planner(start_coord=(0, 1), goal_coord=(6, 1), resolution=(7, 4), heuristic_func=h)
+    for each in [plain, guided]:
+        if planner is dsl.DStarLite:
+            each.make_walls_at(known)
+        else:
+            for coord in known:
+                each.make_wall_at(coord)
+    assert guided.extract_path() == plain.extract_path() == route
+    assert guided._pop_count <= plain._pop_count
+    if planner is lpa.LPAStar:
+        assert guided._pop_count == len(route)  # straight along the path
+
+# all done
+print("Testing complete!")
@@ -7,10 +7,12 @@
 # Provides basic testing functionality for the DualPriorityQueue class
 
 import math
+import operator
 import sys
 
 sys.path.append("/Users/hwbehren/JetBrains/PycharmProjects/DStarLite")
 
+from src import dual_priority_queue as dpq
 from src import lifelong_planning_a_star as lpa
 
 # test manhattan distance
@@ -34,6 +36,28 @@ assert lpa.l2_dist((5, 5), (0, 0)) == math.sqrt(50)
 map_a = lpa.LPAStar(start_coord=(0, 0), goal_coord=(1, 1), resolution=(2, 2))
 assert map_a.extract_path() == [(0, 0), (1, 0), (1, 1)]
 
+# test 1b: integral heuristics select the bucketed queue, fractional ones fall back to the heap as soon as one is seen
+assert isinstance(map_a._U, dpq.BucketPriorityQueue)
+map_f = lpa.LPAStar(start_coord=(0, 0), goal_coord=(1, 1), resolution=(2, 2), heuristic_func=lpa.l2_dist)
+assert isinstance(map_f._U, dpq.DualPriorityQueue)
+assert map_f.extract_path() == [(0, 0), (1, 0), (1, 1)]
+
+
+def uneven_dist(coord1, coord2):
+    distance = lpa.l1_dist(coord1, coord2)
+    return distance if distance % 2 == 0 else distance - 0.5  # integral from the start to the goal, but not everywhere
+
+
+map_u = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3), heuristic_func=uneven_dist)
+assert isinstance(map_u._U, dpq.BucketPriorityQueue)
+assert len(map_u.extract_path()) == 5  # the first fractional key moved the queue over to the heap
+assert isinstance(map_u._U, dpq.DualPriorityQueue)
+
+# test octile distance
+assert lpa.octile_dist((0, 0), (0, 0)) == 0
+assert lpa.octile_dist((0, 0), (3, 1)) == 2 + math.sqrt(2)
+assert lpa.octile_dist((3, 1), (0, 0)) == 2 + math.sqrt(2)
+
 # test 2 (further, no walls)
 #   #####
 #   #S..#   map B
@@ -135,5 +159,184 @@ assert map_e.extract_path() == \
 # how to backtrack to use the new path?
 backpath = map_e.get_backtrack_path()
 
+# test 9: weighted cells (mud in the middle column) make the longer way around cheaper
+#   #####
+#   #S~ #    ~ costs 5 to step into
+#   # ~ #
+#   #  G#
+#   #####
+mud = [[1, 1, 1], [5, 5, 1], [1, 1, 1]]  # indexed as mud[x][y]
+map_w = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3), cost_map=mud)
+assert isinstance(map_w._U, dpq.DualPriorityQueue)  # weighted keys can spread far beyond the map size
+assert map_w.extract_path() == [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
+assert map_w._costs.g[map_w._goal_cell] == 4
+
+# test 9b: incremental cost changes, both up and down, match planning from scratch
+map_w.update_cost((0, 2), 9)  # the bottom row got muddy, so cut through the middle instead
+assert map_w.extract_path() == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+assert map_w._costs.g[map_w._goal_cell] == 8
+map_w.update_cost((1, 0), 1)  # the top row dried up
+assert map_w.extract_path() == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+assert map_w._costs.g[map_w._goal_cell] == 4
+map_w.update_cost((1, 1), 1.5)  # fractional costs work too
+assert map_w._costs.g[map_w._goal_cell] == 4
+fresh = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3),
+                    cost_map=[[1, 1, 9], [1, 1.5, 1], [1, 1, 1]])
+assert fresh.extract_path() == map_w.extract_path()
+map_u = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+map_u.update_cost((1, 1), 2 ** 40)  # the first weighted cell moves a unit map's queue over to the heap, too
+assert isinstance(map_u._U, dpq.DualPriorityQueue)
+assert map_u.extract_path() == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+try:
+    map_w.update_cost((1, 1), 0)
+    assert False
+except ValueError as e:
+    assert "positive" in str(e)
+
+# test 10: 8-connectivity cuts across open space, but never past the corner of a wall
+#   #######
+#   #S    #
+#   # ... #
+#   #  # .#
+#   #    .#
+#   #    G#
+#   #######
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(4, 4), resolution=(5, 5), connectivity=8)
+assert map_o._h is lpa.octile_dist  # the matching heuristic is picked by default
+assert map_o.extract_path() == [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)]
+map_o.make_wall_at((2, 2))
+assert map_o.extract_path() == [(0, 0), (1, 1), (2, 1), (3, 1), (4, 2), (4, 3), (4, 4)]
+assert map_o._costs.g[map_o._goal_cell] == 4 + 2 * math.sqrt(2)
+try:
+    lpa.LPAStar(start_coord=(0, 0), goal_coord=(4, 4), resolution=(5, 5), connectivity=6)
+    assert False
+except ValueError as e:
+    assert "Connectivity" in str(e)
+
+# test 10b: any-angle paths are straightened into segments along lines of sight
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(4, 2), resolution=(5, 3), connectivity="any")
+assert map_o.extract_path() == [(0, 0), (4, 2)]
+map_o.make_wall_at((2, 1))
+assert map_o.extract_path() == [(0, 0), (3, 0), (4, 2)]
+assert not map_o._line_of_sight((1, 0), (3, 2))  # passes exactly through the wall
+assert not map_o._line_of_sight((1, 1), (2, 0))  # squeezes past its corner
+assert map_o._line_of_sight((0, 0), (4, 0))
+for cost_map, costs in [([[1, 1, 1]] * 5, []), (None, [((1, 1), 2)])]:  # straightening would cut through the mud
+    try:
+        map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(4, 2), resolution=(5, 3), cost_map=cost_map,
+                            connectivity="any")
+        for coord, cost in costs:
+            map_o.update_cost(coord, cost)
+        assert False
+    except ValueError as e:
+        assert "cell costs" in str(e)
+
+# test 10c: keys on diagonal maps are snapped to KEY_DIGITS decimals, so sums added up in a different order tie
+assert lpa.SQRT2 + lpa.SQRT2 + 1 != 1 + lpa.SQRT2 + lpa.SQRT2  # straight then diagonal, or the other way round
+assert lpa.round_keys(lpa.SQRT2 + lpa.SQRT2 + 1, 1) == lpa.round_keys(1 + lpa.SQRT2 + lpa.SQRT2, 1)
+
+# test 11: the path can also be iterated, and comes out the same as the extracted one
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+map_o.make_wall_at((1, 1))
+assert list(map_o.iter_path()) == map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+map_o.make_wall_at((2, 1))
+assert list(map_o.iter_path()) == [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
+map_o.make_wall_at((1, 2))
+assert list(map_o.iter_path()) == []  # no path
+
+# test 12: after a change near the goal, the new path meets the last one where they part, and is indexed by coordinate
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(6, 1), resolution=(7, 2))
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (6, 1)]
+map_o.make_wall_at((6, 0))
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (5, 1), (6, 1)]
+assert map_o.get_path_intersection_point() == (5, 0)
+assert map_o.path_index()[(5, 1)] == 6 and (6, 0) not in map_o.path_index()
+
+# test 13: the start can be moved in place; the tree is repaired rather than searched again from scratch
+#   #####
+#   #S  #
+#   # # #
+#   #  G#
+#   #####
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+map_o.make_wall_at((1, 1))
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2)]
+map_o.move_start((1, 0))
+assert map_o.extract_path() == [(1, 0), (2, 0), (2, 1), (2, 2)]
+map_o.make_wall_at((2, 1))
+map_o.move_start((0, 0))  # walk back, and around the other way
+assert map_o.extract_path() == [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2)]
+fresh = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3))
+for wall in [(1, 1), (2, 1)]:
+    fresh.make_wall_at(wall)
+assert map_o.extract_path() == fresh.extract_path()
+try:
+    map_o.move_start((3, 0))
+    assert False
+except ValueError as e:
+    assert "outside" in str(e)
+
+# test 14: a reset planner forgets the walls found since it was built, and plans as a new one would, in the same buffers
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(2, 2), resolution=(3, 3), cost_map=[[1, 1, 1], [1, 5, 1], [1, 1, 1]])
+g, neighbors, h_cache = map_o._costs.g, map_o._neighbors, map_o._h_cache
+map_o.make_wall_at((1, 0))
+map_o.update_cost((0, 1), 4)
+map_o.extract_path()
+queue = map_o._U
+map_o.reset((2, 0), (0, 2))
+assert map_o._U is queue  # emptied and reused
+fresh = lpa.LPAStar(start_coord=(2, 0), goal_coord=(0, 2), resolution=(3, 3), cost_map=[[1, 1, 1], [1, 5, 1], [1, 1, 1]])
+assert map_o.extract_path() == fresh.extract_path()
+assert list(map_o._costs.g) == list(fresh._costs.g) and map_o._pop_count == fresh._pop_count
+assert map_o._costs.g is g and map_o._neighbors is neighbors and map_o._h_cache is h_cache
+assert not map_o._costs.is_wall((1, 0)) and map_o._costs.get_weight((0, 1)) == 1
+
+# test 15: with several goals, the path leads to the nearest; goals can be added and removed without searching again
+#   ######
+#   #S  G#
+#   # ## #
+#   #G   #
+#   ######
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=[(3, 0), (0, 2)], resolution=(4, 3))
+map_o.make_wall_at((1, 1))
+map_o.make_wall_at((2, 1))
+assert map_o.extract_path() == [(0, 0), (0, 1), (0, 2)]
+map_o.remove_goal((0, 2))
+assert map_o.extract_path() == [(0, 0), (1, 0), (2, 0), (3, 0)]
+pops = map_o._pop_count
+map_o.add_goal((1, 0))
+assert map_o.extract_path() == [(0, 0), (1, 0)]
+assert map_o._pop_count == pops  # everything it needed was already settled
+assert map_o.get_goals() == [(3, 0), (1, 0)]
+try:
+    map_o.remove_goal((3, 0))
+    map_o.remove_goal((1, 0))
+    assert False
+except ValueError as e:
+    assert "last goal" in str(e)
+
+# test 16: keys compare as plain tuples; with VALIDATE_KEYS, the checking _tuple_lt gives the same search
+runs = []
+for validate in [False, True]:
+    lpa.VALIDATE_KEYS = validate
+    map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(3, 0), resolution=(4, 3))
+    map_o.make_wall_at((1, 0))
+    map_o.make_wall_at((2, 1))
+    assert map_o._keys_lt() == (map_o._tuple_lt if validate else operator.lt)
+    runs.append((map_o.extract_path(), map_o._pop_count))
+lpa.VALIDATE_KEYS = False
+assert runs[0] == runs[1]
+
+# test 17: a batch of walls already known leaves the path alone; a new one in it invalidates the path
+map_o = lpa.LPAStar(start_coord=(0, 0), goal_coord=(3, 0), resolution=(4, 3))
+map_o.make_walls_at([(1, 0), (2, 1)])
+path = map_o.extract_path()
+map_o.make_walls_at([(1, 0), (2, 1)])
+assert map_o.extract_path() is path
+map_o.make_wall_at((2, 1))  # one at a time, too
+assert map_o.extract_path() is path and map_o._last_path is None
+map_o.make_walls_at([(2, 1), (1, 1)])
+assert map_o.extract_path() == [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (3, 2), (3, 1), (3, 0)]
+
 # all done
 print("Testing complete!")
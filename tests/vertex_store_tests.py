@@ -0,0 +1,97 @@
+# Contributors:
+# Hans Behrens
+# Barath Gunari
+# Rishabh Hatgadkar
+# Nicholas Martinez
+
+# Provides basic testing functionality for the VertexStore class
+
+import sys
+
+sys.path.append("/Users/hwbehren/JetBrains/PycharmProjects/DStarLite")
+
+from src import vertex_store as vs
+
+store = vs.VertexStore(3, 5)
+
+# testing initialization
+assert store.get((0, 0)) == (float("inf"), float("inf"))
+assert store.get((2, 4)) == (float("inf"), float("inf"))
+assert not store.is_wall((1, 1))
+assert store.nbytes() == 2 * 8 * 15 + 2  # two double buffers plus a 15-bit mask
+
+# testing linear cell ids
+assert store.cell_id((0, 0)) == 0
+assert store.cell_id((1, 0)) == 5
+assert store.cell_id((2, 4)) == 14
+assert store.coord(store.cell_id((2, 3))) == (2, 3)
+
+# testing independent g and rhs updates
+store.set_rhs((1, 2), 0)
+assert store.get((1, 2)) == (float("inf"), 0)
+store.set_g((1, 2), 3)
+assert store.get((1, 2)) == (3, 0)
+assert store.get_g((1, 2)) == 3
+assert store.get_rhs((1, 2)) == 0
+assert store.get((1, 3)) == (float("inf"), float("inf"))  # neighbors are untouched
+
+# testing the wall mask, including cells that share a byte
+store.set_wall((1, 2))
+assert store.is_wall((1, 2))
+assert not store.is_wall((1, 1))
+assert not store.is_wall((1, 3))
+store.set_wall((1, 3))
+store.set_wall((1, 2), False)
+assert not store.is_wall((1, 2))
+assert store.is_wall((1, 3))
+
+# testing bulk wall loading
+store = vs.VertexStore(2, 2)
+store.load_walls([[False, True], [True, False]])
+assert [store.is_wall((x, y)) for x in range(2) for y in range(2)] == [False, True, True, False]
+
+# testing the CSR neighbor table on a 3x2 grid (north, east, south, west order)
+directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+store = vs.VertexStore(3, 2)
+table = vs.NeighborTable(3, 2, directions)
+assert list(table.of(store.cell_id((0, 0)))) == [store.cell_id((1, 0)), store.cell_id((0, 1))]
+assert [store.coord(c) for c in table.of(store.cell_id((1, 1)))] == [(1, 0), (2, 1), (0, 1)]
+assert len(table.targets) == 14  # every undirected edge appears once in each direction
+assert list(table.kinds[table.offsets[0]:table.offsets[1]]) == [1, 2]  # east, then south
+
+# testing the wall-aware variant, which leaves out cells that were already walls
+store.set_wall((1, 0))
+table = vs.NeighborTable(3, 2, directions, store)
+assert [store.coord(c) for c in table.of(store.cell_id((1, 1)))] == [(2, 1), (0, 1)]
+assert [store.coord(c) for c in table.of(store.cell_id((0, 0)))] == [(0, 1)]
+
+# testing a table with diagonal directions, which records which direction each neighbor lies in
+table = vs.NeighborTable(3, 2, directions + [(1, -1), (1, 1), (-1, 1), (-1, -1)])
+assert [store.coord(c) for c in table.of(store.cell_id((1, 0)))] == [(2, 0), (1, 1), (0, 0), (2, 1), (0, 1)]
+assert list(table.kinds[table.offsets[2]:table.offsets[3]]) == [1, 2, 3, 5, 6]
+
+# testing traversal weights, which are uniform until one is set
+store = vs.VertexStore(2, 3, 1)
+assert store.weights is None
+assert store.get_weight((1, 2)) == 1
+store.set_weight((1, 2), 2.5)
+assert store.get_weight((1, 2)) == 2.5
+assert store.get_weight((0, 0)) == 1
+assert store.nbytes() == 3 * 8 * 6 + 1  # the weights are a third double buffer
+store.load_weights([[1, 2, 3], [4, 5, 6]])
+assert [store.get_weight_cell(cell) for cell in range(6)] == [1, 2, 3, 4, 5, 6]
+
+# testing a reset, which refills the g/rhs buffers in place, and restoring a snapshot of the walls
+store = vs.VertexStore(2, 2)
+g = store.g
+store.g[1] = store.rhs[2] = 0
+snapshot = store.save_walls()
+store.set_wall((1, 1))
+store.reset()
+store.restore_walls(snapshot)
+assert store.g is g and list(store.g) == list(store.rhs) == [float("inf")] * 4
+assert not store.is_wall((1, 1))
+assert store.nbytes() == 2 * 8 * 4 + 1  # nothing is kept for the next reset
+
+# all done
+print("Testing complete!")